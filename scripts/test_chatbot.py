@@ -6,11 +6,7 @@ from pathlib import Path
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.config import settings
-from src.vector_store.vector_store_manager import VectorStoreManager
-from src.llm.claude_client import ClaudeClient
-from src.session.session_manager import SessionManager
-from src.rag_pipeline import RAGPipeline
+from src.bootstrap import build_pipeline
 
 
 def main():
@@ -22,29 +18,7 @@ def main():
     # Initialize components
     print("\nInitializing components...")
 
-    vector_store = VectorStoreManager(
-        embedding_model=settings.embedding_model,
-        vector_db_type=settings.vector_db_type,
-        vector_db_path=settings.vector_db_path
-    )
-
-    claude_client = ClaudeClient(
-        api_key=settings.anthropic_api_key,
-        model=settings.claude_model,
-        max_tokens=settings.max_tokens,
-        temperature=settings.temperature
-    )
-
-    session_manager = SessionManager(
-        max_history=settings.max_conversation_history
-    )
-
-    rag_pipeline = RAGPipeline(
-        vector_store_manager=vector_store,
-        claude_client=claude_client,
-        session_manager=session_manager,
-        top_k_documents=settings.top_k_documents
-    )
+    rag_pipeline = build_pipeline()
 
     print("✓ Components initialized\n")
 
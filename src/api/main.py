@@ -5,17 +5,15 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
+import json
 import logging
 import tempfile
 import os
 from pathlib import Path
 
 from ..config import settings
-from ..vector_store.vector_store_manager import VectorStoreManager
-from ..llm.claude_client import ClaudeClient
-from ..llm.huggingface_client import HuggingFaceClient
-from ..session.session_manager import SessionManager
 from ..rag_pipeline import RAGPipeline
+from ..bootstrap import build_pipeline
 from ..feedback.feedback_manager import FeedbackManager
 from ..feedback.hallucination_detector import HallucinationDetector
 from ..suggestions.question_generator import QuestionGenerator, PeopleAlsoAsked
@@ -88,45 +86,8 @@ async def startup_event():
     logger.info("Initializing RAG pipeline...")
 
     try:
-        # Initialize vector store
-        vector_store = VectorStoreManager(
-            embedding_model=settings.embedding_model,
-            vector_db_type=settings.vector_db_type,
-            vector_db_path=settings.vector_db_path
-        )
-
-        # Initialize LLM client based on provider
-        if settings.llm_provider == "huggingface":
-            api_key = settings.huggingface_api_key if settings.huggingface_api_key else None
-            llm_client = HuggingFaceClient(
-                model=settings.huggingface_model,
-                max_tokens=settings.max_tokens,
-                temperature=settings.temperature,
-                api_key=api_key
-            )
-            logger.info(f"Using Hugging Face model: {settings.huggingface_model}")
-            logger.info(f"API key configured: {'Yes' if api_key else 'No'}")
-        else:
-            llm_client = ClaudeClient(
-                api_key=settings.anthropic_api_key,
-                model=settings.claude_model,
-                max_tokens=settings.max_tokens,
-                temperature=settings.temperature
-            )
-            logger.info(f"Using Claude model: {settings.claude_model}")
-
-        # Initialize session manager
-        session_manager = SessionManager(
-            max_history=settings.max_conversation_history
-        )
-
-        # Initialize RAG pipeline
-        rag_pipeline = RAGPipeline(
-            vector_store_manager=vector_store,
-            claude_client=llm_client,
-            session_manager=session_manager,
-            top_k_documents=settings.top_k_documents
-        )
+        # Build (or reuse) the RAG pipeline
+        rag_pipeline = build_pipeline()
 
         # Initialize feedback manager
         feedback_manager = FeedbackManager()
@@ -247,6 +208,51 @@ async def chat(request: ChatRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Process chat message and stream the answer as server-sent events.
+
+    Args:
+        request: Chat request with message and optional session_id
+
+    Returns:
+        Event stream of answer tokens, ending with an event carrying the
+        session ID and sources
+    """
+    if not rag_pipeline:
+        raise HTTPException(status_code=503, detail="Service not initialized")
+
+    try:
+        # Create session if not provided
+        session_id = request.session_id
+        if not session_id:
+            session_id = rag_pipeline.create_session()
+
+        result = rag_pipeline.process_query(
+            query=request.message,
+            session_id=session_id,
+            stream=True
+        )
+
+    except Exception as e:
+        logger.error(f"Error processing chat stream request: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    def event_stream():
+        for chunk in result['response']:
+            yield f"data: {json.dumps({'token': chunk})}\n\n"
+
+        yield "data: " + json.dumps({
+            'done': True,
+            'session_id': session_id,
+            'sources': result['sources'],
+            'context_used': result['context_used']
+        }) + "\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
 @app.get("/session/{session_id}/history")
 async def get_session_history(session_id: str):
     """Get conversation history for a session."""
@@ -632,6 +638,7 @@ async def upload_document(file: UploadFile = File(...)):
             # Index into vector store
             rag_pipeline.vector_store.index_documents(processed_docs)
             rag_pipeline.vector_store.save()
+            rag_pipeline.clear_query_cache()
 
             # Reinitialize BM25 if enabled
             if hasattr(rag_pipeline, 'bm25_retriever') and rag_pipeline.bm25_retriever:
@@ -678,6 +685,8 @@ async def delete_document(doc_id: int):
         if not success:
             raise HTTPException(status_code=404, detail=f"Document {doc_id} not found")
 
+        rag_pipeline.clear_query_cache()
+
         # Reinitialize BM25 if enabled
         if hasattr(rag_pipeline, 'bm25_retriever') and rag_pipeline.bm25_retriever:
             from ..retrieval.bm25_retriever import BM25Retriever
@@ -714,6 +723,7 @@ async def clear_all_documents():
 
     try:
         rag_pipeline.vector_store.clear_all_documents()
+        rag_pipeline.clear_query_cache()
 
         # Clear BM25
         if hasattr(rag_pipeline, 'bm25_retriever'):
@@ -761,6 +771,7 @@ async def upload_from_url(url: str):
         # Index into vector store
         rag_pipeline.vector_store.index_documents(processed_docs)
         rag_pipeline.vector_store.save()
+        rag_pipeline.clear_query_cache()
 
         # Reinitialize BM25 if enabled
         if hasattr(rag_pipeline, 'bm25_retriever') and rag_pipeline.bm25_retriever:
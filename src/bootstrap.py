@@ -0,0 +1,64 @@
+"""Shared construction of the RAG pipeline from settings."""
+
+from functools import lru_cache
+import logging
+from .config import settings
+from .vector_store.vector_store_manager import VectorStoreManager
+from .llm.claude_client import ClaudeClient
+from .llm.huggingface_client import HuggingFaceClient
+from .session.session_manager import SessionManager
+from .rag_pipeline import RAGPipeline
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=1)
+def build_pipeline() -> RAGPipeline:
+    """
+    Build the RAG pipeline configured by the global settings.
+
+    Loading the embedding model and vector index dominates start-up, so
+    the pipeline is built once per process and reused by every caller
+    (server start-up, scripts, repeated runs in one interpreter).
+
+    Returns:
+        Shared RAGPipeline instance
+    """
+    # Initialize vector store
+    vector_store = VectorStoreManager(
+        embedding_model=settings.embedding_model,
+        vector_db_type=settings.vector_db_type,
+        vector_db_path=settings.vector_db_path
+    )
+
+    # Initialize LLM client based on provider
+    if settings.llm_provider == "huggingface":
+        api_key = settings.huggingface_api_key if settings.huggingface_api_key else None
+        llm_client = HuggingFaceClient(
+            model=settings.huggingface_model,
+            max_tokens=settings.max_tokens,
+            temperature=settings.temperature,
+            api_key=api_key
+        )
+        logger.info(f"Using Hugging Face model: {settings.huggingface_model}")
+        logger.info(f"API key configured: {'Yes' if api_key else 'No'}")
+    else:
+        llm_client = ClaudeClient(
+            api_key=settings.anthropic_api_key,
+            model=settings.claude_model,
+            max_tokens=settings.max_tokens,
+            temperature=settings.temperature
+        )
+        logger.info(f"Using Claude model: {settings.claude_model}")
+
+    # Initialize session manager
+    session_manager = SessionManager(
+        max_history=settings.max_conversation_history
+    )
+
+    return RAGPipeline(
+        vector_store_manager=vector_store,
+        claude_client=llm_client,
+        session_manager=session_manager,
+        top_k_documents=settings.top_k_documents
+    )
@@ -0,0 +1,114 @@
+"""Persistent SQLite cache for document embeddings."""
+
+from typing import Dict, Iterable, List, Tuple
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import numpy as np
+from .embedding_cache import normalize_text
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DOCUMENT_CACHE_PATH = os.path.join("~", ".cache", "rag", "document_embeddings.sqlite")
+
+# Keys per SELECT, safely below SQLite's bound-parameter limit
+_LOOKUP_CHUNK = 500
+
+
+class SQLiteEmbeddingCache:
+    """
+    Document embeddings keyed by (SHA-256 of the normalized text, model name).
+
+    Texts are normalized with normalize_text() first, so chunks differing
+    only in Unicode form or whitespace share an entry. Re-indexing an
+    unchanged corpus then costs one indexed lookup per chunk instead of a
+    model forward pass. Vectors are stored as raw float32 bytes alongside
+    their dimension.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        path: str = DEFAULT_DOCUMENT_CACHE_PATH,
+        lowercase: bool = False
+    ):
+        """
+        Initialize the cache, creating the database if needed.
+
+        Args:
+            model_name: Embedding model name (part of every key)
+            path: SQLite database file
+            lowercase: Whether to lowercase text before hashing (only safe for uncased models)
+        """
+        self.model_name = model_name
+        self.lowercase = lowercase
+        self.path = os.path.expanduser(path)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                " hash BLOB NOT NULL, model TEXT NOT NULL, dim INTEGER NOT NULL, vec BLOB NOT NULL,"
+                " PRIMARY KEY (hash, model)) WITHOUT ROWID"
+            )
+
+    def key(self, text: str) -> bytes:
+        """Cache key of a document text."""
+        return hashlib.sha256(normalize_text(text, self.lowercase).encode("utf-8")).digest()
+
+    def get_many(self, keys: List[bytes]) -> Dict[bytes, np.ndarray]:
+        """
+        Look up the embeddings of many keys.
+
+        Args:
+            keys: Cache keys from key()
+
+        Returns:
+            Mapping of the keys found to their float32 embeddings
+        """
+        found: Dict[bytes, np.ndarray] = {}
+        unique = list(dict.fromkeys(keys))
+        try:
+            with self._lock:
+                for start in range(0, len(unique), _LOOKUP_CHUNK):
+                    chunk = unique[start:start + _LOOKUP_CHUNK]
+                    rows = self._conn.execute(
+                        f"SELECT hash, dim, vec FROM embeddings WHERE model = ? "
+                        f"AND hash IN ({','.join('?' * len(chunk))})",
+                        (self.model_name, *chunk)
+                    ).fetchall()
+                    for key, dim, vec in rows:
+                        found[key] = np.frombuffer(vec, dtype=np.float32, count=dim)
+        except sqlite3.Error as e:
+            logger.warning(f"Document embedding cache lookup failed: {e}")
+        return found
+
+    def put_many(self, items: Iterable[Tuple[bytes, np.ndarray]]):
+        """
+        Store embeddings, replacing existing entries.
+
+        Args:
+            items: (key, embedding) pairs
+        """
+        rows = []
+        for key, embedding in items:
+            vector = np.ascontiguousarray(embedding, dtype=np.float32)
+            rows.append((key, self.model_name, vector.shape[-1], vector.tobytes()))
+
+        try:
+            with self._lock, self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (hash, model, dim, vec) VALUES (?, ?, ?, ?)",
+                    rows
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Could not write document embedding cache: {e}")
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,154 @@
+"""Two-level (memory + disk) cache for query embeddings."""
+
+from typing import Optional
+from collections import OrderedDict
+import hashlib
+import logging
+import os
+import re
+import threading
+import unicodedata
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join("~", ".cache", "rag", "embeddings")
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def normalize_text(text: str, lowercase: bool = False) -> str:
+    """
+    Normalize text for embedding cache keys.
+
+    Applies NFKC and collapses whitespace runs, which the tokenizer would
+    not distinguish anyway, so formatting-only edits share a cache entry.
+
+    Args:
+        text: Input text
+        lowercase: Whether to lowercase too (only safe for uncased models)
+
+    Returns:
+        Normalized text
+    """
+    text = _WHITESPACE_RE.sub(' ', unicodedata.normalize('NFKC', text)).strip()
+    return text.lower() if lowercase else text
+
+
+class EmbeddingCache:
+    """
+    LRU cache of text embeddings backed by ``.npy`` files on disk.
+
+    Entries are keyed on the SHA-256 of the model name and the text after
+    normalize_text(), and stored on disk as ``{cache_dir}/{sha256[:2]}/{sha256}.npy``
+    so hot queries survive restarts.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+        capacity: int = 10_000,
+        lowercase: bool = False
+    ):
+        """
+        Initialize embedding cache.
+
+        Args:
+            model_name: Embedding model name (part of every key)
+            cache_dir: Directory for the on-disk copies (None keeps the cache in memory only)
+            capacity: Maximum number of embeddings kept in memory
+            lowercase: Whether to lowercase text before hashing (only safe for uncased models)
+        """
+        self.model_name = model_name
+        self.cache_dir = os.path.expanduser(cache_dir) if cache_dir else None
+        self.capacity = capacity
+        self.lowercase = lowercase
+
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, text: str) -> str:
+        """Hash the model name and normalized text."""
+        text = normalize_text(text, self.lowercase)
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.npy")
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        """
+        Look up the embedding of a text.
+
+        Args:
+            text: Input text
+
+        Returns:
+            Cached embedding, or None on a miss
+        """
+        key = self._key(text)
+
+        with self._lock:
+            embedding = self._memory.get(key)
+            if embedding is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                logger.debug(f"Embedding cache hit (memory), hits={self.hits} misses={self.misses}")
+                return embedding
+
+        if self.cache_dir:
+            try:
+                embedding = np.load(self._path(key))
+            except (OSError, ValueError):
+                embedding = None
+
+            if embedding is not None:
+                self._remember(key, embedding)
+                with self._lock:
+                    self.hits += 1
+                logger.debug(f"Embedding cache hit (disk), hits={self.hits} misses={self.misses}")
+                return embedding
+
+        with self._lock:
+            self.misses += 1
+        logger.debug(f"Embedding cache miss, hits={self.hits} misses={self.misses}")
+        return None
+
+    def put(self, text: str, embedding: np.ndarray):
+        """
+        Store the embedding of a text in memory and on disk.
+
+        Args:
+            text: Input text
+            embedding: Embedding vector
+        """
+        key = self._key(text)
+        self._remember(key, embedding)
+
+        if self.cache_dir:
+            path = self._path(key)
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    np.save(f, embedding)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                logger.warning(f"Could not write embedding cache entry: {e}")
+
+    def _remember(self, key: str, embedding: np.ndarray):
+        """Insert into the in-memory LRU, evicting the oldest entry if full."""
+        # Cached arrays are shared between callers, so guard them against in-place edits
+        embedding.flags.writeable = False
+        with self._lock:
+            self._memory[key] = embedding
+            self._memory.move_to_end(key)
+            if len(self._memory) > self.capacity:
+                self._memory.popitem(last=False)
+
+    def clear(self):
+        """Drop the in-memory entries (disk entries are kept)."""
+        with self._lock:
+            self._memory.clear()
@@ -0,0 +1,115 @@
+"""Random-projection LSH index for approximate nearest-neighbour lookups."""
+
+from typing import Dict, Hashable, List, Optional, Set
+from collections import defaultdict
+import numpy as np
+
+
+class RandomProjectionLSH:
+    """
+    Locality-sensitive hash index over cosine similarity.
+
+    Each of the ``num_tables`` tables hashes a vector to a ``num_bits``-bit
+    signature (the signs of its projections onto random hyperplanes).
+    Vectors with a small angle between them share a bucket in at least one
+    table with high probability, so a lookup only has to compare the query
+    against the union of its buckets instead of every stored vector.
+    """
+
+    def __init__(
+        self,
+        dimension: int,
+        num_tables: int = 8,
+        num_bits: int = 16,
+        seed: Optional[int] = None
+    ):
+        """
+        Initialize LSH index.
+
+        Args:
+            dimension: Dimension of indexed vectors
+            num_tables: Number of hash tables (L)
+            num_bits: Signature bits per table (k)
+            seed: Optional seed for the random projections
+        """
+        self.dimension = dimension
+        self.num_tables = num_tables
+        self.num_bits = num_bits
+
+        rng = np.random.default_rng(seed)
+        # Stacked (L * k, d) projection matrix so hashing is a single matmul
+        self._projections = rng.standard_normal(
+            (num_tables * num_bits, dimension)
+        ).astype(np.float32)
+
+        self._tables: List[Dict[bytes, Set[Hashable]]] = [
+            defaultdict(set) for _ in range(num_tables)
+        ]
+        self._signatures: Dict[Hashable, List[bytes]] = {}
+
+    def _hash(self, vector: np.ndarray) -> List[bytes]:
+        """Compute the per-table signatures of a vector."""
+        bits = (self._projections @ vector > 0).astype(np.uint8)
+        return [
+            row.tobytes()
+            for row in np.packbits(bits.reshape(self.num_tables, self.num_bits), axis=1)
+        ]
+
+    def insert(self, item_id: Hashable, vector: np.ndarray):
+        """
+        Add a vector to the index.
+
+        Args:
+            item_id: Identifier returned by ``query``
+            vector: Vector to index
+        """
+        if item_id in self._signatures:
+            self.remove(item_id)
+
+        signatures = self._hash(vector)
+        for table, signature in zip(self._tables, signatures):
+            table[signature].add(item_id)
+        self._signatures[item_id] = signatures
+
+    def remove(self, item_id: Hashable):
+        """
+        Remove a vector from the index.
+
+        Args:
+            item_id: Identifier passed to ``insert``
+        """
+        signatures = self._signatures.pop(item_id, None)
+        if signatures is None:
+            return
+
+        for table, signature in zip(self._tables, signatures):
+            bucket = table[signature]
+            bucket.discard(item_id)
+            if not bucket:
+                del table[signature]
+
+    def query(self, vector: np.ndarray) -> Set[Hashable]:
+        """
+        Get candidate neighbours of a vector.
+
+        Args:
+            vector: Query vector
+
+        Returns:
+            Union of the ids sharing a bucket with the query in any table
+        """
+        candidates = set()
+        for table, signature in zip(self._tables, self._hash(vector)):
+            bucket = table.get(signature)
+            if bucket:
+                candidates.update(bucket)
+        return candidates
+
+    def clear(self):
+        """Remove all vectors from the index."""
+        for table in self._tables:
+            table.clear()
+        self._signatures.clear()
+
+    def __len__(self) -> int:
+        return len(self._signatures)
@@ -0,0 +1,124 @@
+"""Approximate query cache keyed on query embeddings."""
+
+from typing import Any, Optional, Tuple
+from collections import OrderedDict
+import itertools
+import logging
+import numpy as np
+
+from .lsh_cache import RandomProjectionLSH
+
+logger = logging.getLogger(__name__)
+
+
+class ProximityCache:
+    """
+    Bounded LRU cache that matches queries by embedding distance.
+
+    A lookup hits when the L2 distance between the normalized query embedding
+    and a cached key is at most ``threshold``, so near-identical queries reuse
+    the same cached value. Candidate keys come from a random-projection LSH
+    index, so a lookup only compares against a few entries rather than
+    scanning the whole cache.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 256,
+        threshold: float = 0.15,
+        num_tables: int = 8,
+        num_bits: int = 16
+    ):
+        """
+        Initialize proximity cache.
+
+        Args:
+            capacity: Maximum number of cached entries
+            threshold: Maximum L2 distance between normalized embeddings for a hit
+            num_tables: Number of LSH hash tables
+            num_bits: Signature bits per LSH table
+        """
+        self.capacity = capacity
+        self.threshold = threshold
+        self.num_tables = num_tables
+        self.num_bits = num_bits
+
+        self._index: Optional[RandomProjectionLSH] = None  # Created on first put
+        self._entries: "OrderedDict[int, Tuple[np.ndarray, Any]]" = OrderedDict()
+        self._ids = itertools.count()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, embedding: np.ndarray) -> Optional[Any]:
+        """
+        Look up the value cached for the nearest query.
+
+        Args:
+            embedding: Query embedding vector
+
+        Returns:
+            Cached value, or None on a miss
+        """
+        if not self._entries:
+            self.misses += 1
+            return None
+
+        query = self._normalize(embedding)
+        candidates = list(self._index.query(query))
+        if not candidates:
+            self.misses += 1
+            return None
+
+        keys = np.stack([self._entries[entry_id][0] for entry_id in candidates])
+        distances = np.linalg.norm(keys - query, axis=1)
+
+        best = int(np.argmin(distances))
+        if distances[best] > self.threshold:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        entry_id = candidates[best]
+        self._entries.move_to_end(entry_id)
+        return self._entries[entry_id][1]
+
+    def put(self, embedding: np.ndarray, value: Any):
+        """
+        Cache a value under a query embedding, evicting the LRU entry if full.
+
+        Args:
+            embedding: Query embedding vector
+            value: Value to cache
+        """
+        key = self._normalize(embedding)
+
+        if self._index is None:
+            self._index = RandomProjectionLSH(
+                key.shape[0],
+                num_tables=self.num_tables,
+                num_bits=self.num_bits
+            )
+
+        if len(self._entries) >= self.capacity:
+            evicted_id, _ = self._entries.popitem(last=False)
+            self._index.remove(evicted_id)
+
+        entry_id = next(self._ids)
+        self._entries[entry_id] = (key, value)
+        self._index.insert(entry_id, key)
+
+    def clear(self):
+        """Remove all cached entries."""
+        self._entries.clear()
+        if self._index is not None:
+            self._index.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _normalize(embedding: np.ndarray) -> np.ndarray:
+        """Flatten and L2-normalize an embedding as float32."""
+        vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
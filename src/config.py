@@ -17,7 +17,7 @@ class Settings(BaseSettings):
     temperature: float = 0.7
 
     # Vector Database
-    vector_db_type: str = "faiss"  # "faiss" or "pinecone"
+    vector_db_type: str = "faiss"  # "faiss", "faiss-hnsw", "numpy" or "pinecone"
     vector_db_path: str = "./data/vector_store"
     pinecone_api_key: str = ""
     pinecone_environment: str = ""
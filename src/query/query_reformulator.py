@@ -1,22 +1,130 @@
 """Query reformulation for better retrieval using conversation history."""
 
 from typing import List, Dict, Union, Optional
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
 import logging
+import numpy as np
+from ..retrieval.query_features import QueryFeatures
 
 logger = logging.getLogger(__name__)
 
+# Reciprocal rank fusion constant and precomputed per-rank scores
+RRF_K = 60
+_RRF_TABLE_SIZE = 1024
+_RRF_TABLE = 1.0 / (np.arange(_RRF_TABLE_SIZE) + RRF_K)
+
+# Sentence punctuation ignored at word edges; symbols like "+" and "#" are kept
+# so that e.g. "C++" and "C#" stay distinct from "C"
+_EDGE_PUNCTUATION = '.,;:!?"\'()[]{}'
+
+
+def _tuple_doc_id(item) -> str:
+    """Fusion key for a (Document, score) result."""
+    return item[0].page_content[:100]
+
+
+def _dict_doc_id(item) -> str:
+    """Fusion key for a dict result."""
+    return item['content'][:100]
+
+
+def _query_text(query: Union[str, QueryFeatures]) -> str:
+    """Text of a query given as a string or precomputed features."""
+    return query.text if isinstance(query, QueryFeatures) else query
+
+
+def normalize_query(query: str) -> str:
+    """
+    Canonical form of a query for equality checks and cache keys.
+
+    Lowercases, collapses whitespace and strips punctuation at word edges, so
+    rewrites that differ only in case, spacing or punctuation compare equal.
+    """
+    words = (word.strip(_EDGE_PUNCTUATION) for word in query.lower().split())
+    return ' '.join(word for word in words if word)
+
+
+def _rrf_scores(length: int) -> np.ndarray:
+    """Reciprocal rank fusion scores for ranks 0..length-1."""
+    if length <= _RRF_TABLE_SIZE:
+        return _RRF_TABLE[:length]
+    return 1.0 / (np.arange(length) + RRF_K)
+
+
+def _rrf_fuse(
+    id_lists: List[List[str]],
+    result_lists: List[List],
+    weights: List[float],
+    top_k: int,
+    keep_first: bool = True
+) -> List:
+    """
+    Weighted reciprocal rank fusion of several ranked result sets.
+
+    Doc ids are mapped to a dense range in first-seen order and the weighted
+    scores are accumulated with ``np.add.at``; the stable sort keeps that
+    first-seen order among ties.
+
+    Args:
+        id_lists: Fusion keys of each result set, in rank order
+        result_lists: The result sets themselves
+        weights: Weight of each result set
+        top_k: Number of fused results to return
+        keep_first: Return the item from the first set a doc appears in
+            (otherwise from the last)
+
+    Returns:
+        Top fused items, best first
+    """
+    unique_ids = list(dict.fromkeys(chain.from_iterable(id_lists)))
+    dense = dict(zip(unique_ids, range(len(unique_ids))))
+
+    fused = np.zeros(len(unique_ids))
+    for ids, weight in zip(id_lists, weights):
+        positions = np.fromiter(map(dense.__getitem__, ids), dtype=np.intp, count=len(ids))
+        np.add.at(fused, positions, weight * _rrf_scores(len(ids)))
+
+    order = np.argsort(-fused, kind='stable')[:top_k]
+
+    items = {}
+    pairs = list(zip(id_lists, result_lists))
+    for ids, results in (reversed(pairs) if keep_first else pairs):
+        items.update(zip(ids, results))
+    return [items[unique_ids[i]] for i in order.tolist()]
+
+
+def _doc_id_extractor(results: List):
+    """
+    Pick the fusion-key extractor for a result set.
+
+    Result sets are homogeneous (all tuples or all dicts), so the item type
+    is checked once per set instead of once per item.
+    """
+    if results and isinstance(results[0], tuple):
+        return _tuple_doc_id
+    return _dict_doc_id
+
 
 class QueryReformulator:
     """Reformulate user queries using LLM and conversation history."""
 
-    def __init__(self, llm_client):
+    # Maximum number of formatted history snippets kept in memory
+    HISTORY_CACHE_SIZE = 256
+
+    def __init__(self, llm_client, max_history_chars: Optional[int] = 300):
         """
         Initialize query reformulator.
 
         Args:
             llm_client: LLM client instance (Claude or HuggingFace)
+            max_history_chars: Maximum characters kept per assistant message
+                in the reformulation prompt (None disables truncation)
         """
         self.llm_client = llm_client
+        self.max_history_chars = max_history_chars
+        self._history_text_cache: "OrderedDict[tuple, str]" = OrderedDict()
 
     def reformulate(
         self,
@@ -124,10 +232,7 @@ class QueryReformulator:
         # Get last few turns (up to 3 exchanges)
         recent_history = conversation_history[-6:] if len(conversation_history) > 6 else conversation_history
 
-        history_text = ""
-        for msg in recent_history:
-            role = "User" if msg['role'] == 'user' else "Assistant"
-            history_text += f"{role}: {msg['content']}\n"
+        history_text = self._format_history(recent_history)
 
         prompt = f"""Given the following conversation history and a new user question, reformulate the question to be a standalone question that can be understood without the conversation context.
 
@@ -140,6 +245,60 @@ Reformulated Standalone Question:"""
 
         return prompt
 
+    def _format_history(self, recent_history: List[Dict[str, str]]) -> str:
+        """
+        Format history messages as "Role: content" lines, memoized per turn.
+
+        The key is the (role, content) pairs themselves, so any new message
+        changes the key and stale entries simply age out of the LRU.
+
+        Args:
+            recent_history: Messages to format
+
+        Returns:
+            Formatted history text
+        """
+        key = tuple((msg['role'], msg['content']) for msg in recent_history)
+
+        history_text = self._history_text_cache.get(key)
+        if history_text is not None:
+            self._history_text_cache.move_to_end(key)
+            return history_text
+
+        history_text = "".join(
+            f"User: {content}\n" if role == 'user'
+            else f"Assistant: {self._truncate(content)}\n"
+            for role, content in key
+        )
+
+        self._history_text_cache[key] = history_text
+        if len(self._history_text_cache) > self.HISTORY_CACHE_SIZE:
+            self._history_text_cache.popitem(last=False)
+
+        return history_text
+
+    def _truncate(self, content: str) -> str:
+        """
+        Shorten a long assistant reply, keeping its head and tail.
+
+        User messages are never truncated since pronouns usually refer
+        to nouns the user mentioned; the assistant reply only needs enough
+        text to resolve them.
+
+        Args:
+            content: Message content
+
+        Returns:
+            Content capped to roughly max_history_chars characters
+        """
+        limit = self.max_history_chars
+        if not limit or len(content) <= limit:
+            return content
+
+        # Explicit start index: content[-0:] would be the whole string
+        tail = limit // 3
+        return content[:limit // 2] + " ... " + content[len(content) - tail:]
+
     def _is_valid_reformulation(self, original: str, reformulated: str) -> bool:
         """
         Validate that reformulation is reasonable.
@@ -198,6 +357,9 @@ Reformulated: "What is your return policy?"
 class HybridRetrieval:
     """Combine semantic (vector) and keyword (BM25) retrieval for better results."""
 
+    # Maximum number of vector search results kept in memory
+    SEARCH_CACHE_SIZE = 512
+
     def __init__(self, vector_retriever, bm25_retriever=None):
         """
         Initialize hybrid retrieval.
@@ -208,11 +370,52 @@ class HybridRetrieval:
         """
         self.vector_retriever = vector_retriever
         self.bm25_retriever = bm25_retriever
+        # FAISS and the BM25 kernel spend most of their time outside the GIL,
+        # so independent searches overlap instead of running back to back
+        self._executor = ThreadPoolExecutor(
+            max_workers=3, thread_name_prefix="hybrid-retrieval"
+        )
+        # (normalized query, k) -> vector results, shared by all retrieval arms
+        self._search_cache: "OrderedDict[tuple, List]" = OrderedDict()
+
+    @property
+    def retriever(self):
+        """Backward-compatible alias for the vector retriever."""
+        return self.vector_retriever
+
+    def _vector_search(self, query: Union[str, QueryFeatures]) -> List:
+        """Vector search reusing the query embedding when features are given."""
+        key = (normalize_query(_query_text(query)), self.vector_retriever.top_k)
+        cached = self._search_cache.get(key)
+        if cached is not None:
+            self._search_cache.move_to_end(key)
+            return cached
+
+        if isinstance(query, QueryFeatures):
+            results = self.vector_retriever.retrieve_features(query)
+        else:
+            results = self.vector_retriever.retrieve(query)
+
+        # Arms may run on different threads; OrderedDict ops are atomic under the GIL
+        self._search_cache[key] = results
+        if len(self._search_cache) > self.SEARCH_CACHE_SIZE:
+            self._search_cache.popitem(last=False)
+        return results
+
+    def clear_cache(self):
+        """Drop cached search results (call after the document set changes)."""
+        self._search_cache.clear()
+
+    def _bm25_search(self, query: Union[str, QueryFeatures]) -> List:
+        """BM25 search reusing the query tokens when features are given."""
+        if isinstance(query, QueryFeatures):
+            return self.bm25_retriever.retrieve_features(query)
+        return self.bm25_retriever.retrieve(query)
 
     def retrieve_with_reformulation(
         self,
-        original_query: str,
-        reformulated_query: str,
+        original_query: Union[str, QueryFeatures],
+        reformulated_query: Union[str, QueryFeatures],
         original_weight: float = 0.3,
         reformulated_weight: float = 0.7
     ) -> List[Dict]:
@@ -220,21 +423,22 @@ class HybridRetrieval:
         Retrieve documents using both original and reformulated queries.
 
         Args:
-            original_query: Original user query
-            reformulated_query: Reformulated standalone query
+            original_query: Original user query (text or precomputed features)
+            reformulated_query: Reformulated standalone query (text or precomputed features)
             original_weight: Weight for original query results
             reformulated_weight: Weight for reformulated query results
 
         Returns:
             Combined and re-ranked documents
         """
-        # Retrieve with both queries
-        original_results = self.vector_retriever.retrieve(original_query)
-        reformulated_results = self.vector_retriever.retrieve(reformulated_query)
-
         # If queries are the same, just return one set
-        if original_query == reformulated_query:
-            return reformulated_results
+        if normalize_query(_query_text(original_query)) == normalize_query(_query_text(reformulated_query)):
+            return self._vector_search(reformulated_query)
+
+        # Retrieve with both queries concurrently
+        original_future = self._executor.submit(self._vector_search, original_query)
+        reformulated_results = self._vector_search(reformulated_query)
+        original_results = original_future.result()
 
         # Combine and re-rank
         combined = self._combine_results(
@@ -248,7 +452,7 @@ class HybridRetrieval:
 
     def retrieve_hybrid(
         self,
-        query: str,
+        query: Union[str, QueryFeatures],
         vector_weight: float = 0.6,
         bm25_weight: float = 0.4
     ) -> List[Dict]:
@@ -256,23 +460,22 @@ class HybridRetrieval:
         Retrieve documents using hybrid semantic + keyword search.
 
         Args:
-            query: Search query
+            query: Search query (text or precomputed features)
             vector_weight: Weight for semantic vector search
             bm25_weight: Weight for BM25 keyword search
 
         Returns:
             Combined and re-ranked documents
         """
-        # Get vector search results
-        vector_results = self.vector_retriever.retrieve(query)
-
         # If no BM25 retriever, return vector results only
         if not self.bm25_retriever:
             logger.info("No BM25 retriever available, using vector search only")
-            return vector_results
+            return self._vector_search(query)
 
-        # Get BM25 keyword search results
-        bm25_results = self.bm25_retriever.retrieve(query)
+        # Run BM25 in the background while the vector search runs here
+        bm25_future = self._executor.submit(self._bm25_search, query)
+        vector_results = self._vector_search(query)
+        bm25_results = bm25_future.result()
 
         # Combine both result sets
         combined = self._combine_results(
@@ -287,8 +490,8 @@ class HybridRetrieval:
 
     def retrieve_full_hybrid(
         self,
-        original_query: str,
-        reformulated_query: str,
+        original_query: Union[str, QueryFeatures],
+        reformulated_query: Union[str, QueryFeatures],
         vector_weight: float = 0.5,
         bm25_weight: float = 0.3,
         reformulation_weight: float = 0.2
@@ -302,8 +505,8 @@ class HybridRetrieval:
         3. Semantic vector search on reformulated query
 
         Args:
-            original_query: Original user query
-            reformulated_query: Reformulated query with context
+            original_query: Original user query (text or precomputed features)
+            reformulated_query: Reformulated query with context (text or precomputed features)
             vector_weight: Weight for semantic search
             bm25_weight: Weight for keyword search
             reformulation_weight: Weight for reformulated query
@@ -311,26 +514,27 @@ class HybridRetrieval:
         Returns:
             Combined and re-ranked documents
         """
-        results_list = []
+        futures = []
         weights = []
 
+        # Dispatch all searches concurrently; total latency is the slowest
+        # search rather than the sum of all three
         # 1. Vector search on original query
-        vector_results = self.vector_retriever.retrieve(original_query)
-        results_list.append(vector_results)
+        futures.append(self._executor.submit(self._vector_search, original_query))
         weights.append(vector_weight)
 
         # 2. BM25 keyword search (if available)
         if self.bm25_retriever:
-            bm25_results = self.bm25_retriever.retrieve(original_query)
-            results_list.append(bm25_results)
+            futures.append(self._executor.submit(self._bm25_search, original_query))
             weights.append(bm25_weight)
 
         # 3. Vector search on reformulated query (if different)
-        if reformulated_query != original_query:
-            reformulated_results = self.vector_retriever.retrieve(reformulated_query)
-            results_list.append(reformulated_results)
+        if normalize_query(_query_text(reformulated_query)) != normalize_query(_query_text(original_query)):
+            futures.append(self._executor.submit(self._vector_search, reformulated_query))
             weights.append(reformulation_weight)
 
+        results_list = [future.result() for future in futures]
+
         # Combine all result sets
         if len(results_list) == 1:
             return results_list[0]
@@ -354,35 +558,23 @@ class HybridRetrieval:
         Returns:
             Combined and re-ranked documents
         """
-        scores = {}
-        doc_map = {}
+        id_lists, result_lists, set_weights = [], [], []
 
+        # Drop result sets identical to an earlier one so they are not double-weighted
+        seen_rankings = set()
         for results, weight in zip(results_list, weights):
-            for rank, item in enumerate(results):
-                if isinstance(item, tuple):
-                    doc, _ = item
-                    doc_id = doc.page_content[:100]
-                    doc_map[doc_id] = item
-                else:
-                    doc_id = item['content'][:100]
-                    doc_map[doc_id] = item
-
-                rrf_score = 1.0 / (rank + 60)
-                scores[doc_id] = scores.get(doc_id, 0) + (rrf_score * weight)
-
-                if doc_id not in doc_map:
-                    doc_map[doc_id] = item
-
-        # Sort by combined score
-        sorted_docs = sorted(
-            doc_map.items(),
-            key=lambda x: scores.get(x[0], 0),
-            reverse=True
-        )
+            doc_ids = tuple(map(_doc_id_extractor(results), results))
+            if doc_ids in seen_rankings:
+                continue
+            seen_rankings.add(doc_ids)
+
+            id_lists.append(doc_ids)
+            result_lists.append(results)
+            set_weights.append(weight)
 
         # Return top documents
         top_k = getattr(self.vector_retriever, 'top_k', 5)
-        return [doc for _, doc in sorted_docs[:top_k]]
+        return _rrf_fuse(id_lists, result_lists, set_weights, top_k, keep_first=False)
 
     def _combine_results(
         self,
@@ -397,45 +589,13 @@ class HybridRetrieval:
         Uses reciprocal rank fusion for combining results.
         Args can be either List[Tuple[Document, float]] or List[Dict]
         """
-        # Create a scoring dictionary
-        scores = {}
-        doc_map = {}
-
-        # Score results from first query
-        for rank, item in enumerate(results1):
-            if isinstance(item, tuple):
-                doc, _ = item
-                doc_id = doc.page_content[:100]  # Use content prefix as ID
-                doc_map[doc_id] = item
-            else:
-                doc_id = item['content'][:100]
-                doc_map[doc_id] = item
-
-            rrf_score = 1.0 / (rank + 60)  # Reciprocal rank fusion
-            scores[doc_id] = scores.get(doc_id, 0) + (rrf_score * weight1)
-
-        # Score results from second query
-        for rank, item in enumerate(results2):
-            if isinstance(item, tuple):
-                doc, _ = item
-                doc_id = doc.page_content[:100]
-                if doc_id not in doc_map:
-                    doc_map[doc_id] = item
-            else:
-                doc_id = item['content'][:100]
-                if doc_id not in doc_map:
-                    doc_map[doc_id] = item
-
-            rrf_score = 1.0 / (rank + 60)
-            scores[doc_id] = scores.get(doc_id, 0) + (rrf_score * weight2)
-
-        # Sort by combined score
-        sorted_docs = sorted(
-            doc_map.items(),
-            key=lambda x: scores.get(x[0], 0),
-            reverse=True
-        )
-
-        # Return top documents
         top_k = getattr(self.vector_retriever, 'top_k', 5)
-        return [doc for _, doc in sorted_docs[:top_k]]
+
+        # Identical rankings fuse to themselves, so skip the fusion entirely
+        ids1 = list(map(_doc_id_extractor(results1), results1))
+        ids2 = ids1 if results2 is results1 else list(map(_doc_id_extractor(results2), results2))
+        if ids1 == ids2 and len(set(ids1)) == len(ids1):
+            return list(results1[:top_k])
+
+        # Reciprocal rank fusion
+        return _rrf_fuse([ids1, ids2], [results1, results2], [weight1, weight2], top_k)
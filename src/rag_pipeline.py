@@ -1,14 +1,17 @@
 """Main RAG pipeline orchestration."""
 
-from typing import Dict, Any, List, Generator, Union
+from typing import Dict, Any, List, Generator, Optional, Union
 import logging
+import os
 from .vector_store.vector_store_manager import VectorStoreManager
 from .retrieval.retriever import DocumentRetriever
 from .retrieval.bm25_retriever import BM25Retriever
+from .retrieval.query_features import QueryFeatures
 from .llm.claude_client import ClaudeClient
 from .llm.huggingface_client import HuggingFaceClient, PromptTemplate
 from .session.session_manager import SessionManager
-from .query.query_reformulator import QueryReformulator, HybridRetrieval
+from .query.query_reformulator import QueryReformulator, HybridRetrieval, normalize_query
+from .cache.proximity_cache import ProximityCache
 
 logger = logging.getLogger(__name__)
 
@@ -23,7 +26,10 @@ class RAGPipeline:
         session_manager: SessionManager,
         top_k_documents: int = 5,
         use_query_reformulation: bool = True,
-        use_bm25: bool = True
+        use_bm25: bool = True,
+        use_query_cache: bool = True,
+        query_cache_threshold: float = 0.15,
+        query_cache_capacity: int = 256
     ):
         """
         Initialize RAG pipeline.
@@ -35,35 +41,63 @@ class RAGPipeline:
             top_k_documents: Number of documents to retrieve
             use_query_reformulation: Whether to use query reformulation
             use_bm25: Whether to use BM25 keyword search in hybrid retrieval
+            use_query_cache: Whether to reuse retrieval results for near-identical queries
+            query_cache_threshold: Max L2 distance between normalized query embeddings for a cache hit
+            query_cache_capacity: Max number of cached retrieval results
         """
         self.vector_store = vector_store_manager
         self.retriever = DocumentRetriever(vector_store_manager, top_k=top_k_documents)
         self.claude_client = claude_client
         self.session_manager = session_manager
         self.prompt_template = PromptTemplate
+        self._system_prompt = PromptTemplate.SYSTEM_PROMPT
+        self._format_user_query = PromptTemplate.format_user_query
 
-        # BM25 keyword retrieval
+        # BM25 keyword retrieval (hybrid retrieval is attached once BM25 is set up)
+        self.hybrid_retrieval = None
         self.bm25_retriever = None
         if use_bm25:
             try:
                 # Get all documents from vector store for BM25 indexing
                 all_docs = self._get_all_documents()
                 if all_docs:
-                    self.bm25_retriever = BM25Retriever(all_docs, top_k=top_k_documents)
+                    self.bm25_retriever = self._load_or_build_bm25(all_docs, top_k_documents)
                     logger.info(f"✓ BM25 keyword search enabled ({len(all_docs)} documents)")
                 else:
                     logger.warning("No documents available for BM25 indexing")
             except Exception as e:
                 logger.error(f"Failed to initialize BM25: {e}")
 
+        # Hybrid fusion is used for vector + BM25 even without reformulation
+        self.hybrid_retrieval = HybridRetrieval(self.retriever, self.bm25_retriever)
+
+        # Approximate cache of retrieval results keyed on query embeddings
+        self.query_cache = None
+        if use_query_cache:
+            self.query_cache = ProximityCache(
+                capacity=query_cache_capacity,
+                threshold=query_cache_threshold
+            )
+
         # Query reformulation with hybrid retrieval
         self.use_query_reformulation = use_query_reformulation
         if use_query_reformulation:
             self.query_reformulator = QueryReformulator(claude_client)
-            self.hybrid_retrieval = HybridRetrieval(self.retriever, self.bm25_retriever)
             logger.info("✓ Query reformulation enabled")
             logger.info("✓ Hybrid retrieval: Vector (semantic) + BM25 (keyword) + Reformulation")
 
+    @property
+    def bm25_retriever(self) -> Optional[BM25Retriever]:
+        """BM25 retriever used for keyword search."""
+        return self._bm25_retriever
+
+    @bm25_retriever.setter
+    def bm25_retriever(self, retriever: Optional[BM25Retriever]):
+        # Keep hybrid retrieval on the same index the query features are encoded with
+        self._bm25_retriever = retriever
+        if self.hybrid_retrieval is not None:
+            self.hybrid_retrieval.bm25_retriever = retriever
+
     def process_query(
         self,
         query: str,
@@ -89,29 +123,47 @@ class RAGPipeline:
         if self.use_query_reformulation and history:
             reformulated_query = self.query_reformulator.reformulate(query, history)
             logger.info(f"Query: '{query}' -> '{reformulated_query}'")
+            # A rewrite differing only in case, spacing or punctuation adds nothing
+            if normalize_query(reformulated_query) == normalize_query(original_query):
+                reformulated_query = original_query
         else:
             reformulated_query = query
 
         # Step 3: Retrieve relevant documents with hybrid approach
-        if self.use_query_reformulation and reformulated_query != original_query:
-            # Full hybrid: Vector + BM25 + Reformulation
-            retrieval_results = self.hybrid_retrieval.retrieve_full_hybrid(
-                original_query,
-                reformulated_query,
-                vector_weight=0.5,      # Semantic search weight
-                bm25_weight=0.3,        # Keyword search weight
-                reformulation_weight=0.2  # Reformulated query weight
-            )
-        elif self.bm25_retriever:
-            # Hybrid: Vector + BM25 only
-            retrieval_results = self.hybrid_retrieval.retrieve_hybrid(
-                query,
-                vector_weight=0.6,
-                bm25_weight=0.4
-            )
-        else:
-            # Vector search only
-            retrieval_results = self.retriever.retrieve(reformulated_query)
+        # Embed/tokenize the query once and share it with the cache and every retriever
+        query_features = self._featurize(reformulated_query)
+
+        # Results of a reformulated query also depend on the original query,
+        # which the embedding key doesn't capture, so only plain queries are cached
+        use_cache = self.query_cache is not None and reformulated_query == original_query
+
+        retrieval_results = None
+        if use_cache:
+            retrieval_results = self.query_cache.get(query_features.embedding)
+
+        if retrieval_results is None:
+            if self.use_query_reformulation and reformulated_query != original_query:
+                # Full hybrid: Vector + BM25 + Reformulation
+                retrieval_results = self.hybrid_retrieval.retrieve_full_hybrid(
+                    self._featurize(original_query),
+                    query_features,
+                    vector_weight=0.5,      # Semantic search weight
+                    bm25_weight=0.3,        # Keyword search weight
+                    reformulation_weight=0.2  # Reformulated query weight
+                )
+            elif self.bm25_retriever:
+                # Hybrid: Vector + BM25 only (query == reformulated_query here)
+                retrieval_results = self.hybrid_retrieval.retrieve_hybrid(
+                    query_features,
+                    vector_weight=0.6,
+                    bm25_weight=0.4
+                )
+            else:
+                # Vector search only
+                retrieval_results = self.retriever.retrieve_features(query_features)
+
+            if use_cache:
+                self.query_cache.put(query_features.embedding, retrieval_results)
 
         # Step 4: Format context
         context = self.retriever.format_context(retrieval_results)
@@ -121,17 +173,19 @@ class RAGPipeline:
 
         # Step 6: Generate response
         if stream:
-            response_text = self._generate_streaming_response(messages)
+            response_text = self._record_stream(
+                session_id, self._generate_streaming_response(messages)
+            )
         else:
             response_text = self.claude_client.generate_response(
-                system_prompt=PromptTemplate.SYSTEM_PROMPT,
+                system_prompt=self._system_prompt,
                 messages=messages,
                 stream=False
             )
 
         # Step 7: Save to session history
         self.session_manager.add_message(session_id, 'user', query)
-        if not stream:  # For streaming, this happens after full response
+        if not stream:  # For streaming, _record_stream saves it once the stream ends
             self.session_manager.add_message(session_id, 'assistant', response_text)
 
         # Step 8: Prepare response
@@ -150,6 +204,23 @@ class RAGPipeline:
 
         return response_data
 
+    def _featurize(self, query: str) -> QueryFeatures:
+        """
+        Compute the query embedding and BM25 tokens once for all retrievers.
+
+        Args:
+            query: Query text
+
+        Returns:
+            QueryFeatures for the query
+        """
+        embedding = self.vector_store.embed_query(query)
+        if self.bm25_retriever:
+            tokens, term_ids = self.bm25_retriever.encode_query(query)
+        else:
+            tokens, term_ids = query.lower().split(), None
+        return QueryFeatures(query, embedding, tokens, term_ids)
+
     def _build_messages(
         self,
         query: str,
@@ -167,23 +238,10 @@ class RAGPipeline:
         Returns:
             Formatted message list
         """
-        messages = []
-
-        # Add recent history (without timestamps)
-        for msg in history:
-            messages.append({
-                'role': msg['role'],
-                'content': msg['content']
-            })
-
-        # Add current query with context
-        current_message = PromptTemplate.format_user_query(query, context)
-        messages.append({
-            'role': 'user',
-            'content': current_message
-        })
-
-        return messages
+        # Recent history already comes as fresh role/content dicts (no
+        # timestamps), so reuse them instead of copying each message
+        current_message = self._format_user_query(query, context)
+        return [*history, {'role': 'user', 'content': current_message}]
 
     def _generate_streaming_response(
         self,
@@ -191,23 +249,87 @@ class RAGPipeline:
     ) -> Generator[str, None, None]:
         """Generate streaming response."""
         return self.claude_client.generate_response(
-            system_prompt=PromptTemplate.SYSTEM_PROMPT,
+            system_prompt=self._system_prompt,
             messages=messages,
             stream=True
         )
 
+    def _record_stream(
+        self,
+        session_id: str,
+        chunks: Generator[str, None, None]
+    ) -> Generator[str, None, None]:
+        """
+        Pass streamed chunks through and save the full answer to the session.
+
+        Chunks are accumulated in a bytearray rather than by repeated string
+        concatenation, and the assistant message is added once when the
+        stream finishes or is closed early.
+
+        Args:
+            session_id: Session identifier
+            chunks: Streamed response text chunks
+
+        Yields:
+            The response text chunks unchanged
+        """
+        buffer = bytearray()
+        try:
+            for chunk in chunks:
+                buffer.extend(chunk.encode('utf-8'))
+                yield chunk
+        finally:
+            if buffer:
+                self.session_manager.add_message(session_id, 'assistant', buffer.decode('utf-8'))
+
     def create_session(self) -> str:
         """Create a new conversation session."""
         return self.session_manager.create_session()
 
     def get_session_history(self, session_id: str) -> List[Dict[str, str]]:
-        """Get conversation history for a session."""
-        return self.session_manager.get_history(session_id)
+        """Get conversation history for a session, with message timestamps."""
+        return self.session_manager.get_history(session_id, include_timestamps=True)
 
     def clear_session(self, session_id: str) -> bool:
         """Clear a session's history."""
         return self.session_manager.delete_session(session_id)
 
+    def clear_query_cache(self):
+        """Drop cached retrieval results (call after the document set changes)."""
+        if self.query_cache is not None:
+            self.query_cache.clear()
+        self.hybrid_retrieval.clear_cache()
+
+    def _load_or_build_bm25(self, documents: List[Dict], top_k: int) -> BM25Retriever:
+        """
+        Load the saved BM25 index for these documents, or build and save one.
+
+        Args:
+            documents: Documents from the vector store
+            top_k: Number of top documents to retrieve
+
+        Returns:
+            BM25Retriever over the documents
+        """
+        db_path = getattr(self.vector_store, 'vector_db_path', None)
+        if not db_path:
+            return BM25Retriever(documents, top_k=top_k)
+
+        index_dir = os.path.join(db_path, "bm25")
+        try:
+            return BM25Retriever.load(index_dir, documents, top_k=top_k)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError) as e:
+            logger.info(f"Rebuilding BM25 index: {e}")
+
+        retriever = BM25Retriever(documents, top_k=top_k)
+        try:
+            retriever.save(index_dir)
+        except OSError as e:
+            logger.warning(f"Could not save BM25 index: {e}")
+        return retriever
+
     def _get_all_documents(self) -> List[Dict]:
         """
         Get all documents from vector store for BM25 indexing.
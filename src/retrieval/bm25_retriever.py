@@ -1,27 +1,121 @@
 """BM25-based keyword retrieval for hybrid search."""
 
-from typing import List, Dict, Tuple
-from rank_bm25 import BM25Okapi
+from typing import List, Dict, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from langchain.docstore.document import Document
+from .query_features import QueryFeatures
+import hashlib
+import json
 import logging
+import os
+import shutil
+import numpy as np
+from scipy import sparse
+
+try:
+    from numba import njit
+except ImportError:  # Optional: fall back to the NumPy scorer
+    njit = None
 
 logger = logging.getLogger(__name__)
 
+# Bump when the on-disk index layout changes
+BM25_INDEX_VERSION = 1
+_INDEX_ARRAYS = ('indptr', 'doc_ids', 'tf', 'idf', 'doc_len')
+
+
+def _bm25_scores_loop(query_term_ids, indptr, doc_ids, tf, idf, doc_len,
+                      len_base, len_scale, k1, doc_lo, doc_hi, out):
+    """
+    Accumulate BM25 scores of documents ``doc_lo..doc_hi-1`` into ``out``.
+
+    Walks the posting list of every query term (duplicates included, as in
+    BM25Okapi) and adds ``idf * tf * (k1 + 1) / (tf + k1 * length_norm)``
+    to each posting's document. ``k1 * length_norm`` is recomputed as
+    ``len_base + len_scale * doc_len`` from the compact integer lengths.
+    Compiled with Numba when available.
+    """
+    for t in query_term_ids:
+        weight = idf[t]
+        start, end = indptr[t], indptr[t + 1]
+        # Doc ids ascend within a posting list, so the range's postings are contiguous
+        first = start + np.searchsorted(doc_ids[start:end], doc_lo)
+        last = start + np.searchsorted(doc_ids[start:end], doc_hi)
+        for p in range(first, last):
+            d = doc_ids[p]
+            freq = tf[p]
+            out[d] += weight * freq * (k1 + 1.0) / (freq + len_base + len_scale * doc_len[d])
+
+
+def _bm25_scores_numpy(query_term_ids, indptr, doc_ids, tf, idf, doc_len,
+                       len_base, len_scale, k1, doc_lo, doc_hi, out):
+    """NumPy fallback for ``_bm25_scores_loop``, vectorized per posting list."""
+    for t in query_term_ids:
+        start, end = indptr[t], indptr[t + 1]
+        first = start + np.searchsorted(doc_ids[start:end], doc_lo)
+        end = start + np.searchsorted(doc_ids[start:end], doc_hi)
+        start = first
+        docs = doc_ids[start:end]
+        freq = tf[start:end]
+        # Doc ids are unique within a posting list, so fancy-index += is safe
+        out[docs] += idf[t] * freq * (k1 + 1.0) / (freq + len_base + len_scale * doc_len[docs])
+
+
+if njit is not None:
+    # nogil lets document shards be scored on several threads at once
+    _bm25_scores = njit(cache=True, fastmath=True, nogil=True)(_bm25_scores_loop)
+else:
+    _bm25_scores = _bm25_scores_numpy
+
+
+@lru_cache(maxsize=1)
+def _scoring_executor() -> ThreadPoolExecutor:
+    """Thread pool shared by all retrievers for sharded scoring."""
+    return ThreadPoolExecutor(thread_name_prefix="bm25-shard")
+
 
 class BM25Retriever:
     """BM25-based keyword retrieval for exact term matching."""
 
-    def __init__(self, documents: List[Dict] = None, top_k: int = 5):
+    # Corpora at least this large are scored in parallel document shards
+    SHARD_MIN_DOCS = 100_000
+
+    def __init__(
+        self,
+        documents: List[Dict] = None,
+        top_k: int = 5,
+        k1: float = 1.5,
+        b: float = 0.75,
+        epsilon: float = 0.25
+    ):
         """
         Initialize BM25 retriever.
 
         Args:
             documents: List of document dictionaries with 'content' field
             top_k: Number of top documents to retrieve
+            k1: BM25 term frequency saturation
+            b: BM25 document length normalization
+            epsilon: Floor for negative idf values, as a fraction of the average idf
         """
         self.top_k = top_k
+        self.k1 = k1
+        self.b = b
+        self.epsilon = epsilon
         self.documents = []
-        self.bm25 = None
+        self._doc_objects: List[Document] = []
+        self._shard_bounds: Optional[List[Tuple[int, int]]] = None
+
+        # Inverted index: postings of term t are indptr[t]:indptr[t + 1]
+        self.vocabulary: Dict[str, int] = {}
+        self.indptr: np.ndarray = None
+        self.doc_ids: np.ndarray = None
+        self.tf: np.ndarray = None
+        self.idf: np.ndarray = None
+        self.doc_len: np.ndarray = None
+        self.avgdl = 0.0
+        self._weights: sparse.csr_matrix = None  # Term x doc BM25 weights for batches
 
         if documents:
             self.index_documents(documents)
@@ -33,7 +127,7 @@ class BM25Retriever:
         Args:
             documents: List of document dictionaries
         """
-        self.documents = documents
+        self._set_documents(documents)
 
         # Tokenize documents (simple word splitting)
         tokenized_docs = [
@@ -41,11 +135,235 @@ class BM25Retriever:
             for doc in documents
         ]
 
-        # Create BM25 index
-        self.bm25 = BM25Okapi(tokenized_docs)
+        # Collect (term, doc, tf) triples in document order
+        vocabulary = {}
+        term_ids, doc_ids, tf = [], [], []
+        for doc_id, tokens in enumerate(tokenized_docs):
+            counts = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, count in counts.items():
+                term_ids.append(vocabulary.setdefault(token, len(vocabulary)))
+                doc_ids.append(doc_id)
+                tf.append(count)
+
+        # Group postings by term; the stable sort keeps doc ids ascending per term
+        term_ids = np.asarray(term_ids, dtype=np.int64)
+        order = np.argsort(term_ids, kind='stable')
+        self.vocabulary = vocabulary
+        self.doc_ids = np.asarray(doc_ids, dtype=np.int32)[order]
+        self.tf = np.asarray(tf, dtype=np.float32)[order]
+        self.indptr = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(term_ids, minlength=len(vocabulary)), out=self.indptr[1:])
+
+        # Okapi idf with negative values floored to epsilon * average idf
+        num_docs = len(documents)
+        doc_freq = np.diff(self.indptr).astype(np.float64)
+        idf = np.log(num_docs - doc_freq + 0.5) - np.log(doc_freq + 0.5)
+        if len(idf):
+            idf[idf < 0] = self.epsilon * idf.mean()
+        self.idf = idf.astype(np.float32)
+
+        # Chunk lengths are small, so int16 usually suffices; the scoring kernel
+        # derives the length norm from these instead of keeping a float array
+        doc_len = np.fromiter((len(t) for t in tokenized_docs), dtype=np.int64, count=num_docs)
+        len_dtype = np.int16 if doc_len.max(initial=0) <= np.iinfo(np.int16).max else np.int32
+        self.doc_len = doc_len.astype(len_dtype)
+        self.avgdl = float(doc_len.mean()) if num_docs else 0.0
+        self._weights = None
 
         logger.info(f"Indexed {len(documents)} documents for BM25 retrieval")
 
+    def _set_documents(self, documents: List[Dict]):
+        """Keep the indexed documents and their prebuilt result Documents."""
+        self.documents = documents
+
+        # Build result Documents once instead of on every retrieve
+        self._doc_objects = [
+            Document(page_content=doc['content'], metadata=doc.get('metadata', {}))
+            for doc in documents
+        ]
+
+        # Contiguous doc-id ranges, one per core; sharding needs the GIL-free kernel
+        num_shards = os.cpu_count() or 1
+        if njit is not None and num_shards > 1 and len(documents) >= self.SHARD_MIN_DOCS:
+            bounds = np.linspace(0, len(documents), num_shards + 1).astype(int).tolist()
+            self._shard_bounds = list(zip(bounds[:-1], bounds[1:]))
+        else:
+            self._shard_bounds = None
+
+    @staticmethod
+    def content_hash(documents: List[Dict]) -> str:
+        """
+        Fingerprint a document list for matching a saved index.
+
+        Document ids are list positions, so the hash depends on order.
+
+        Args:
+            documents: List of document dictionaries with 'content' field
+
+        Returns:
+            Hex digest identifying the documents' contents
+        """
+        digest = hashlib.sha256()
+        for doc in documents:
+            digest.update(doc.get('content', '').encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def save(self, directory: str):
+        """
+        Save the index arrays to a directory (one .npy file per array).
+
+        Args:
+            directory: Target directory; replaced if it exists
+        """
+        tmp_dir = f"{directory}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+
+        for name in _INDEX_ARRAYS:
+            np.save(os.path.join(tmp_dir, f"{name}.npy"), getattr(self, name))
+
+        # Terms are stored in id order
+        meta = {
+            'version': BM25_INDEX_VERSION,
+            'content_hash': self.content_hash(self.documents),
+            'epsilon': self.epsilon,
+            'avgdl': self.avgdl,
+            'vocabulary': sorted(self.vocabulary, key=self.vocabulary.get),
+        }
+        with open(os.path.join(tmp_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+
+        shutil.rmtree(directory, ignore_errors=True)
+        os.replace(tmp_dir, directory)
+        logger.info(f"Saved BM25 index to {directory}")
+
+    @classmethod
+    def load(
+        cls,
+        directory: str,
+        documents: List[Dict],
+        top_k: int = 5,
+        k1: float = 1.5,
+        b: float = 0.75,
+        epsilon: float = 0.25
+    ) -> "BM25Retriever":
+        """
+        Load a saved index for the given documents, memory-mapping the arrays.
+
+        Args:
+            directory: Directory written by ``save``
+            documents: The documents the index was built from, in the same order
+            top_k: Number of top documents to retrieve
+            k1: BM25 term frequency saturation
+            b: BM25 document length normalization
+            epsilon: Floor for negative idf values, as a fraction of the average idf
+
+        Returns:
+            BM25Retriever ready for retrieval
+
+        Raises:
+            FileNotFoundError: If no saved index exists
+            ValueError: If the saved index is stale or was built differently
+        """
+        with open(os.path.join(directory, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+
+        if meta.get('version') != BM25_INDEX_VERSION:
+            raise ValueError(f"Unsupported BM25 index version: {meta.get('version')}")
+        if meta.get('epsilon') != epsilon:
+            raise ValueError("BM25 index was built with a different epsilon")
+        if meta.get('content_hash') != cls.content_hash(documents):
+            raise ValueError("BM25 index does not match the current documents")
+
+        retriever = cls(top_k=top_k, k1=k1, b=b, epsilon=epsilon)
+        retriever._set_documents(documents)
+        for name in _INDEX_ARRAYS:
+            setattr(retriever, name, np.load(os.path.join(directory, f"{name}.npy"), mmap_mode='r'))
+        retriever.vocabulary = {term: i for i, term in enumerate(meta['vocabulary'])}
+        retriever.avgdl = meta['avgdl']
+
+        logger.info(f"Loaded BM25 index for {len(documents)} documents from {directory}")
+        return retriever
+
+    def encode_query(self, query: str) -> Tuple[List[str], np.ndarray]:
+        """
+        Tokenize a query and map its tokens to vocabulary ids.
+
+        Args:
+            query: Search query
+
+        Returns:
+            Tuple of (tokens, term ids); tokens outside the vocabulary are dropped
+            from the ids
+        """
+        tokens = self._tokenize(query)
+        term_ids = np.fromiter(
+            (self.vocabulary[t] for t in tokens if t in self.vocabulary),
+            dtype=np.int64
+        )
+        return tokens, term_ids
+
+    def get_scores(self, query: str) -> np.ndarray:
+        """
+        Compute BM25 scores of every document for a query.
+
+        Args:
+            query: Search query
+
+        Returns:
+            Array of scores, one per indexed document
+        """
+        _, term_ids = self.encode_query(query)
+        return self._score_term_ids(term_ids)
+
+    def _score_term_ids(self, query_term_ids: np.ndarray) -> np.ndarray:
+        """Compute BM25 scores of every document for encoded query terms."""
+        scores = np.zeros(len(self.documents), dtype=np.float32)
+        self._score_range(query_term_ids, 0, len(scores), scores)
+        return scores
+
+    def _score_range(self, query_term_ids: np.ndarray, doc_lo: int, doc_hi: int, scores: np.ndarray):
+        """Write BM25 scores of documents ``doc_lo..doc_hi-1`` into ``scores``."""
+        _bm25_scores(
+            query_term_ids, self.indptr, self.doc_ids, self.tf,
+            self.idf, self.doc_len, *self._length_norm_coefficients(),
+            np.float32(self.k1), doc_lo, doc_hi, scores
+        )
+
+    def _score_shard(
+        self,
+        query_term_ids: np.ndarray,
+        doc_lo: int,
+        doc_hi: int,
+        scores: np.ndarray
+    ) -> np.ndarray:
+        """Score one document shard and return the ids of its top-k documents."""
+        self._score_range(query_term_ids, doc_lo, doc_hi, scores)
+        shard_scores = scores[doc_lo:doc_hi]
+        top_k = min(self.top_k, len(shard_scores))
+        if top_k < len(shard_scores):
+            return np.argpartition(shard_scores, -top_k)[-top_k:] + doc_lo
+        return np.arange(doc_lo, doc_hi)
+
+    def _retrieve_term_ids(self, query_term_ids: np.ndarray) -> List[Tuple[Document, float]]:
+        """Score encoded query terms and return the top-k results."""
+        if self._shard_bounds is None:
+            return self._top_results(self._score_term_ids(query_term_ids))
+
+        # Shards write disjoint slices of one score array and each keep their
+        # own top-k; the global top-k is among those candidates
+        scores = np.zeros(len(self.documents), dtype=np.float32)
+        executor = _scoring_executor()
+        futures = [
+            executor.submit(self._score_shard, query_term_ids, doc_lo, doc_hi, scores)
+            for doc_lo, doc_hi in self._shard_bounds
+        ]
+        candidates = np.concatenate([future.result() for future in futures])
+        return self._top_results(scores, candidates)
+
     def retrieve(self, query: str) -> List[Tuple[Document, float]]:
         """
         Retrieve documents using BM25 keyword matching.
@@ -56,43 +374,134 @@ class BM25Retriever:
         Returns:
             List of (Document, score) tuples matching vector retriever format
         """
-        if not self.bm25 or not self.documents:
+        if self.indptr is None or not self.documents:
+            logger.warning("BM25 index is empty, returning empty results")
+            return []
+
+        # Get BM25 scores and keep the top k
+        _, term_ids = self.encode_query(query)
+        results = self._retrieve_term_ids(term_ids)
+
+        logger.info(f"BM25 retrieved {len(results)} documents for query: '{query}'")
+        return results
+
+    def retrieve_features(self, features: QueryFeatures) -> List[Tuple[Document, float]]:
+        """
+        Retrieve documents for a pre-encoded query, skipping tokenization.
+
+        Args:
+            features: Query features with ``term_ids`` from ``encode_query``
+
+        Returns:
+            List of (Document, score) tuples matching vector retriever format
+        """
+        if features.term_ids is None:
+            return self.retrieve(features.text)
+
+        if self.indptr is None or not self.documents:
             logger.warning("BM25 index is empty, returning empty results")
             return []
 
-        # Tokenize query
-        tokenized_query = self._tokenize(query)
+        results = self._retrieve_term_ids(features.term_ids)
 
-        # Get BM25 scores
-        scores = self.bm25.get_scores(tokenized_query)
+        logger.info(f"BM25 retrieved {len(results)} documents for query: '{features.text}'")
+        return results
 
-        # Get top-k document indices
-        top_indices = sorted(
-            range(len(scores)),
-            key=lambda i: scores[i],
-            reverse=True
-        )[:self.top_k]
+    def retrieve_batch(self, queries: List[str]) -> List[List[Tuple[Document, float]]]:
+        """
+        Retrieve documents for several queries in one sparse matrix product.
 
-        # Return documents as (Document, score) tuples to match vector retriever format
-        results = []
-        for idx in top_indices:
-            doc_dict = self.documents[idx]
+        Args:
+            queries: Search queries
 
-            # Create Document object
-            doc = Document(
-                page_content=doc_dict['content'],
-                metadata=doc_dict.get('metadata', {})
-            )
+        Returns:
+            One list of (Document, score) tuples per query, as in ``retrieve``
+        """
+        if self.indptr is None or not self.documents:
+            logger.warning("BM25 index is empty, returning empty results")
+            return [[] for _ in queries]
 
-            # BM25 scores are similarity (higher is better), convert to distance-like
-            # by inverting: lower distance = higher similarity
-            distance = 1.0 / (1.0 + float(scores[idx]))
+        if self._weights is None:
+            self._weights = self._build_weight_matrix()
 
-            results.append((doc, distance))
+        # Query x term matrix of term counts (repeated terms count repeatedly, as in retrieve)
+        rows, cols = [], []
+        for row, query in enumerate(queries):
+            for token in self._tokenize(query):
+                term_id = self.vocabulary.get(token)
+                if term_id is not None:
+                    rows.append(row)
+                    cols.append(term_id)
+        query_matrix = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+            shape=(len(queries), len(self.vocabulary))
+        )
 
-        logger.info(f"BM25 retrieved {len(results)} documents for query: '{query}'")
+        all_scores = (query_matrix @ self._weights).toarray()
+
+        results = [self._top_results(scores) for scores in all_scores]
+        logger.info(f"BM25 retrieved results for a batch of {len(queries)} queries")
         return results
 
+    def _build_weight_matrix(self) -> sparse.csr_matrix:
+        """Precompute the term x document matrix of per-posting BM25 weights."""
+        posting_terms = np.repeat(
+            np.arange(len(self.vocabulary)), np.diff(self.indptr)
+        )
+        len_base, len_scale = self._length_norm_coefficients()
+        weights = self.idf[posting_terms] * self.tf * (self.k1 + 1.0) / (
+            self.tf + len_base + len_scale * self.doc_len[self.doc_ids]
+        )
+        return sparse.csr_matrix(
+            (weights.astype(np.float32), self.doc_ids, self.indptr),
+            shape=(len(self.vocabulary), len(self.documents))
+        )
+
+    def _length_norm_coefficients(self) -> Tuple[np.float32, np.float32]:
+        """Split ``k1 * (1 - b + b * doc_len / avgdl)`` into base and per-token scale."""
+        return (
+            np.float32(self.k1 * (1 - self.b)),
+            np.float32(self.k1 * self.b / max(self.avgdl, 1e-9)),
+        )
+
+    def _top_results(
+        self,
+        scores: np.ndarray,
+        candidates: Optional[np.ndarray] = None
+    ) -> List[Tuple[Document, float]]:
+        """
+        Turn a score array into the top-k (Document, distance) results.
+
+        Args:
+            scores: BM25 score per indexed document
+            candidates: Document ids known to contain the top-k (default: all)
+
+        Returns:
+            Top-k (Document, distance) tuples, best first
+        """
+        if candidates is not None:
+            top_indices = candidates[np.argsort(scores[candidates])[::-1][:self.top_k]]
+        else:
+            # Get top-k document indices: partition in C, then sort only those k
+            top_k = min(self.top_k, len(scores))
+            if top_k < len(scores):
+                top_indices = np.argpartition(scores, -top_k)[-top_k:]
+            else:
+                top_indices = np.arange(len(scores))
+            top_indices = top_indices[np.argsort(scores[top_indices])[::-1]]
+
+        # BM25 scores are similarity (higher is better), convert to distance-like
+        # by inverting: lower distance = higher similarity
+        distances = (1.0 / (1.0 + scores[top_indices].astype(np.float64))).tolist()
+
+        # Return the prebuilt Documents as (Document, score) tuples to match
+        # vector retriever format
+        doc_objects = self._doc_objects
+        return [
+            (doc_objects[idx], distance)
+            for idx, distance in zip(top_indices.tolist(), distances)
+        ]
+
     def _tokenize(self, text: str) -> List[str]:
         """
         Simple tokenization by splitting on whitespace and lowercasing.
@@ -0,0 +1,20 @@
+"""Per-query features shared by the retrievers."""
+
+from typing import List, NamedTuple, Optional
+import numpy as np
+
+
+class QueryFeatures(NamedTuple):
+    """
+    Query representations computed once per request.
+
+    Attributes:
+        text: Query text
+        embedding: Query embedding for vector search
+        tokens: BM25 tokens of the query
+        term_ids: BM25 vocabulary ids of the tokens (None without a BM25 index)
+    """
+    text: str
+    embedding: np.ndarray
+    tokens: List[str]
+    term_ids: Optional[np.ndarray] = None
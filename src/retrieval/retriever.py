@@ -2,6 +2,7 @@
 
 from typing import List, Dict, Any, Tuple
 from langchain.docstore.document import Document
+from .query_features import QueryFeatures
 
 
 class DocumentRetriever:
@@ -37,42 +38,39 @@ class DocumentRetriever:
         """
         k = k or self.top_k
 
-        # Get documents from vector store
-        results = self.vector_store_manager.search(query, k=k * 2)  # Get more for filtering
-
-        # Apply metadata filters if provided
-        if filter_metadata:
-            results = self._filter_by_metadata(results, filter_metadata)
+        # Get documents from vector store; metadata filters are applied inside the search
+        results = self.vector_store_manager.search(query, k=k * 2, filter_metadata=filter_metadata)
 
         # Rank and return top k
         ranked_results = self._rank_results(results, query)
         return ranked_results[:k]
 
-    def _filter_by_metadata(
+    def retrieve_features(
         self,
-        results: List[Tuple[Document, float]],
-        filters: Dict[str, Any]
+        features: QueryFeatures,
+        k: int = None,
+        filter_metadata: Dict[str, Any] = None
     ) -> List[Tuple[Document, float]]:
         """
-        Filter documents by metadata.
+        Retrieve relevant documents for a pre-embedded query.
 
         Args:
-            results: List of (Document, score) tuples
-            filters: Metadata key-value pairs to filter by
+            features: Query features carrying the query embedding
+            k: Number of documents to retrieve (overrides default)
+            filter_metadata: Optional metadata filters
 
         Returns:
-            Filtered results
+            List of (Document, score) tuples
         """
-        filtered = []
-        for doc, score in results:
-            match = all(
-                doc.metadata.get(key) == value
-                for key, value in filters.items()
-            )
-            if match:
-                filtered.append((doc, score))
-
-        return filtered
+        k = k or self.top_k
+
+        # Search with the precomputed embedding instead of re-embedding the text
+        results = self.vector_store_manager.search_by_embedding(
+            features.embedding, k=k * 2, filter_metadata=filter_metadata
+        )
+
+        ranked_results = self._rank_results(results, features.text)
+        return ranked_results[:k]
 
     def _rank_results(
         self,
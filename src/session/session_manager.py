@@ -1,52 +1,120 @@
 """Session management for multi-turn conversations."""
 
-from typing import Dict, List, Optional
-from datetime import datetime, timedelta
-import uuid
+from typing import Deque, Dict, List, Optional, Tuple
+from collections import deque
+from datetime import datetime
+from itertools import islice
+import heapq
+import secrets
+import time
+
+# Offset that maps time.monotonic() readings onto wall-clock POSIX time
+_MONOTONIC_TO_WALL = time.time() - time.monotonic()
+
+
+def _format_ts(t: float) -> str:
+    """Format a time.monotonic() reading as a local ISO 8601 timestamp."""
+    return datetime.fromtimestamp(t + _MONOTONIC_TO_WALL).isoformat()
 
 
 class ConversationSession:
     """Represents a single conversation session."""
 
-    def __init__(self, session_id: str):
-        """Initialize conversation session."""
+    def __init__(self, session_id: str, max_messages: Optional[int] = None):
+        """
+        Initialize conversation session.
+
+        Args:
+            session_id: Session identifier
+            max_messages: Maximum messages kept; older ones are evicted on append
+                (None keeps everything)
+        """
         self.session_id = session_id
-        self.messages: List[Dict[str, str]] = []
+        # Messages are stored as parallel deques (role, content, monotonic timestamp)
+        self._roles: Deque[str] = deque(maxlen=max_messages)
+        self._contents: Deque[str] = deque(maxlen=max_messages)
+        self._timestamps: Deque[float] = deque(maxlen=max_messages)
         self.created_at = datetime.now()
-        self.last_active = datetime.now()
+        self.last_active_ts = time.monotonic()
         self.metadata: Dict[str, any] = {}
 
+    @property
+    def last_active(self) -> datetime:
+        """Time of the last activity in this session."""
+        return datetime.fromtimestamp(self.last_active_ts + _MONOTONIC_TO_WALL)
+
+    @property
+    def messages(self) -> List[Dict[str, str]]:
+        """All messages as dictionaries, including ISO timestamps."""
+        return [
+            {'role': r, 'content': c, 'timestamp': _format_ts(t)}
+            for r, c, t in zip(self._roles, self._contents, self._timestamps)
+        ]
+
+    @property
+    def message_count(self) -> int:
+        """Number of messages in the session."""
+        return len(self._roles)
+
     def add_message(self, role: str, content: str):
         """Add a message to the conversation history."""
-        self.messages.append({
-            'role': role,
-            'content': content,
-            'timestamp': datetime.now().isoformat()
-        })
-        self.last_active = datetime.now()
+        now = time.monotonic()
+        self._roles.append(role)
+        self._contents.append(content)
+        self._timestamps.append(now)
+        self.last_active_ts = now
 
-    def get_history(self, max_messages: int = None) -> List[Dict[str, str]]:
+    def get_history(
+        self,
+        max_messages: int = None,
+        include_timestamps: bool = False
+    ) -> List[Dict[str, str]]:
         """
         Get conversation history.
 
         Args:
             max_messages: Maximum number of messages to return (most recent)
+            include_timestamps: Whether to add each message's ISO 'timestamp'
+                (prompt building only needs role and content)
+
+        Returns:
+            List of messages with 'role' and 'content' (and 'timestamp')
+        """
+        start = max(0, len(self._roles) - max_messages) if max_messages else 0
+        if include_timestamps:
+            return [
+                {'role': r, 'content': c, 'timestamp': _format_ts(t)}
+                for r, c, t in islice(zip(self._roles, self._contents, self._timestamps), start, None)
+            ]
+        return [
+            {'role': r, 'content': c}
+            for r, c in islice(zip(self._roles, self._contents), start, None)
+        ]
+
+    def first_message(self, role: str) -> Optional[str]:
+        """
+        Get the content of the first message with a given role.
+
+        Args:
+            role: Message role ('user' or 'assistant')
 
         Returns:
-            List of messages
+            Message content or None if there is no such message
         """
-        if max_messages and len(self.messages) > max_messages:
-            return self.messages[-max_messages:]
-        return self.messages
+        try:
+            return self._contents[self._roles.index(role)]
+        except ValueError:
+            return None
 
     def clear_history(self):
         """Clear conversation history."""
-        self.messages = []
+        self._roles.clear()
+        self._contents.clear()
+        self._timestamps.clear()
 
-    def is_expired(self, timeout_minutes: int = 60) -> bool:
+    def is_expired(self, timeout_seconds: float = 3600) -> bool:
         """Check if session is expired."""
-        timeout = timedelta(minutes=timeout_minutes)
-        return datetime.now() - self.last_active > timeout
+        return time.monotonic() - self.last_active_ts > timeout_seconds
 
 
 class SessionManager:
@@ -63,6 +131,10 @@ class SessionManager:
         self.sessions: Dict[str, ConversationSession] = {}
         self.max_history = max_history
         self.session_timeout = session_timeout
+        self._timeout_seconds = session_timeout * 60
+        # (expiry deadline, session_id), at most one entry per session; an entry
+        # may predate later activity and is re-pushed when it comes due
+        self._expiry_heap: List[Tuple[float, str]] = []
 
     def create_session(self) -> str:
         """
@@ -71,10 +143,32 @@ class SessionManager:
         Returns:
             Session ID
         """
-        session_id = str(uuid.uuid4())
-        self.sessions[session_id] = ConversationSession(session_id)
+        # 96 random bits as a 16-char URL-safe string
+        session_id = secrets.token_urlsafe(12)
+        # Deques cap the history (*2 for user+assistant pairs) as messages arrive
+        session = ConversationSession(session_id, max_messages=self.max_history * 2)
+        self.sessions[session_id] = session
+        self._schedule_expiry(session)
+        self.cleanup_expired_sessions()
         return session_id
 
+    def _schedule_expiry(self, session: ConversationSession):
+        """Record the session's current expiry deadline."""
+        heapq.heappush(
+            self._expiry_heap,
+            (session.last_active_ts + self._timeout_seconds, session.session_id)
+        )
+
+    def _forget_session(self, session_id: str):
+        """Drop a session, compacting the heap once removed sessions dominate it."""
+        del self.sessions[session_id]
+        if len(self._expiry_heap) > 2 * len(self.sessions) + 16:
+            self._expiry_heap = [
+                (session.last_active_ts + self._timeout_seconds, sid)
+                for sid, session in self.sessions.items()
+            ]
+            heapq.heapify(self._expiry_heap)
+
     def get_session(self, session_id: str) -> Optional[ConversationSession]:
         """
         Get a session by ID.
@@ -87,9 +181,9 @@ class SessionManager:
         """
         session = self.sessions.get(session_id)
 
-        if session and session.is_expired(self.session_timeout):
+        if session and session.is_expired(self._timeout_seconds):
             # Clean up expired session
-            del self.sessions[session_id]
+            self._forget_session(session_id)
             return None
 
         return session
@@ -111,17 +205,15 @@ class SessionManager:
             return False
 
         session.add_message(role, content)
-
-        # Limit history size
-        if len(session.messages) > self.max_history * 2:  # *2 for user+assistant pairs
-            session.messages = session.messages[-(self.max_history * 2):]
+        self.cleanup_expired_sessions()
 
         return True
 
     def get_history(
         self,
         session_id: str,
-        max_messages: int = None
+        max_messages: int = None,
+        include_timestamps: bool = False
     ) -> List[Dict[str, str]]:
         """
         Get conversation history for a session.
@@ -129,6 +221,7 @@ class SessionManager:
         Args:
             session_id: Session identifier
             max_messages: Maximum number of messages to return
+            include_timestamps: Whether to add each message's ISO 'timestamp'
 
         Returns:
             List of messages or empty list if session not found
@@ -137,7 +230,7 @@ class SessionManager:
         if not session:
             return []
 
-        return session.get_history(max_messages or self.max_history * 2)
+        return session.get_history(max_messages or self.max_history * 2, include_timestamps)
 
     def delete_session(self, session_id: str) -> bool:
         """
@@ -150,21 +243,37 @@ class SessionManager:
             True if deleted, False if not found
         """
         if session_id in self.sessions:
-            del self.sessions[session_id]
+            self._forget_session(session_id)
             return True
         return False
 
     def cleanup_expired_sessions(self):
-        """Remove all expired sessions."""
-        expired = [
-            sid for sid, session in self.sessions.items()
-            if session.is_expired(self.session_timeout)
-        ]
+        """
+        Remove all expired sessions.
 
-        for sid in expired:
-            del self.sessions[sid]
+        Only pops heap entries whose deadline has passed, so it is O(1) when
+        nothing is due and runs on every create_session() and add_message().
+        Entries of deleted sessions are discarded; sessions active since
+        their entry was pushed are re-pushed with their current deadline.
 
-        return len(expired)
+        Returns:
+            Number of sessions removed
+        """
+        now = time.monotonic()
+        removed = 0
+
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            _, sid = heapq.heappop(self._expiry_heap)
+            session = self.sessions.get(sid)
+            if session is None:
+                continue
+            if session.is_expired(self._timeout_seconds):
+                del self.sessions[sid]
+                removed += 1
+            else:
+                self._schedule_expiry(session)
+
+        return removed
 
     def get_session_count(self) -> int:
         """Get total number of active sessions."""
@@ -181,20 +290,16 @@ class SessionManager:
         for session_id, session in self.sessions.items():
             # Generate title from first user message
             title = "New Conversation"
-            if session.messages:
-                first_user_msg = next(
-                    (msg for msg in session.messages if msg['role'] == 'user'),
-                    None
-                )
-                if first_user_msg:
-                    title = first_user_msg['content'][:50]
-                    if len(first_user_msg['content']) > 50:
-                        title += "..."
+            first_user_msg = session.first_message('user')
+            if first_user_msg is not None:
+                title = first_user_msg[:50]
+                if len(first_user_msg) > 50:
+                    title += "..."
 
             sessions_list.append({
                 'session_id': session_id,
                 'title': session.metadata.get('title', title),
-                'message_count': len(session.messages),
+                'message_count': session.message_count,
                 'created_at': session.created_at.isoformat(),
                 'last_active': session.last_active.isoformat()
             })
@@ -1,16 +1,151 @@
 """Generate suggested questions based on document content."""
 
-from typing import List, Dict, Set
+from typing import List, Dict, Optional, Set
 import re
+import hashlib
 import logging
-from collections import Counter
+from bisect import bisect_right
+from collections import Counter, OrderedDict
+from itertools import accumulate
 
 logger = logging.getLogger(__name__)
 
+# Capitalized words of 3+ letters (potential topics)
+_CAPITALIZED_RE = re.compile(r'\b[A-Z][A-Za-z]{2,}\b')
+
+# Sentences ending with ?
+_QUESTION_RE = re.compile(r'([A-Z][^.!?]*\?)')
+
+# Question phrases removed when extracting a query's topic
+_QUESTION_PHRASES = (
+    'what is', 'what are', 'how to', 'how do', 'how does',
+    'why is', 'why does', 'where can', 'when should',
+    'can i', 'should i', 'tell me about'
+)
+
+# Articles, additionally removed from "People Also Asked" topics
+_ARTICLES = ('the', 'a', 'an')
+
+
+def _trie_pattern(node: Dict[str, dict]) -> str:
+    """
+    Regex for the phrases stored in a character trie.
+
+    Phrases sharing a prefix share one branch, so at each position the
+    engine follows a single path down the trie (as an Aho-Corasick goto
+    function would) instead of trying every phrase in turn.
+    """
+    branches = [
+        re.escape(char) + _trie_pattern(child)
+        for char, child in sorted(node.items()) if char
+    ]
+    if not branches:
+        return ''
+    body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+    # '' marks the end of a phrase: the rest is optional, longest tried first
+    return '(?:' + body + ')?' if '' in node else body
+
+
+def _stop_phrase_re(phrases) -> re.Pattern:
+    """Compile one trie-shaped regex removing whole-word phrases and question marks."""
+    trie: Dict[str, dict] = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    return re.compile(rf'\b{_trie_pattern(trie)}\b|\?')
+
+
+_QUESTION_WORDS_RE = _stop_phrase_re(_QUESTION_PHRASES)
+_TOPIC_STOP_RE = _stop_phrase_re(_QUESTION_PHRASES + _ARTICLES)
+
+# Joins document texts for a single regex pass; the period keeps question
+# matches from spanning two documents
+_DOC_SEPARATOR = "\n.\n"
+
+# Query-type markers, matched against a query's words and word pairs
+_WORD_RE = re.compile(r'\w+')
+_DEFINITION_TERMS = frozenset({'what is', 'what are', 'define'})
+_HOW_TO_TERMS = frozenset({'how to', 'how do', 'how does'})
+_WHY_TERMS = frozenset({'why', 'reason'})
+
+
+def _query_terms(query_lower: str) -> Set[str]:
+    """Words and adjacent word pairs of a lowercased query, for marker checks."""
+    words = _WORD_RE.findall(query_lower)
+    terms = set(words)
+    terms.update(map(' '.join, zip(words, words[1:])))
+    return terms
+
+
+# Question templates as bound str.format methods, built once at import
+_TOPIC_TEMPLATES = (
+    "What is {}?".format,
+    "How to use {}?".format,
+    "What are {} best practices?".format,
+)
+
+# "People Also Asked" templates per query type
+_PAA_DEFINITION_TEMPLATES = (
+    "How to use {}?".format,
+    "What are {} examples?".format,
+    "What are the benefits of {}?".format,
+    "When should I use {}?".format,
+)
+_PAA_HOW_TO_TEMPLATES = (
+    "What are {} best practices?".format,
+    "What are common {} mistakes?".format,
+    "Can you show {} examples?".format,
+    "What is {}?".format,
+)
+_PAA_WHY_TEMPLATES = (
+    "How to implement {}?".format,
+    "What are the benefits of {}?".format,
+    "What is {}?".format,
+    "When should I use {}?".format,
+)
+_PAA_GENERIC_TEMPLATES = (
+    "What is {}?".format,
+    "How to use {}?".format,
+    "What are {} examples?".format,
+    "Why use {}?".format,
+)
+
+# Joins lowercased questions for autocomplete; never typed by users
+_QUESTION_SEPARATOR = "\x00"
+
+
+class _AutocompleteIndex:
+    """Questions lowercased and joined into one string for C-level substring search."""
+
+    def __init__(self, questions: List[str]):
+        self.questions = questions
+        self._text = _QUESTION_SEPARATOR.join(q.lower() for q in questions)
+        # Offset of each question in the joined text, plus the end sentinel
+        self._starts = list(accumulate((len(q) + 1 for q in questions), initial=0))
+
+    def search(self, partial_lower: str, limit: int) -> List[str]:
+        """Return the first ``limit`` questions containing ``partial_lower``."""
+        if _QUESTION_SEPARATOR in partial_lower:
+            return []
+
+        matches = []
+        pos = self._text.find(partial_lower)
+        while pos != -1 and len(matches) < limit:
+            i = bisect_right(self._starts, pos) - 1
+            matches.append(self.questions[i])
+            # Resume at the next question so each one matches at most once
+            pos = self._text.find(partial_lower, self._starts[i + 1])
+        return matches
+
 
 class QuestionGenerator:
     """Generate smart question suggestions from documents."""
 
+    # Maximum number of document sets whose questions are kept in memory
+    QUESTION_CACHE_SIZE = 32
+
     def __init__(self):
         """Initialize question generator."""
         # Common question starters
@@ -25,6 +160,12 @@ class QuestionGenerator:
             r'\b[A-Z][A-Za-z]+\b',  # Capitalized words (proper nouns)
         ]
 
+        # Substring index over the last autocomplete question list
+        self._autocomplete_index: Optional[_AutocompleteIndex] = None
+
+        # (document fingerprint, max_questions) -> generated questions
+        self._question_cache: "OrderedDict[tuple, List[str]]" = OrderedDict()
+
     def generate_from_documents(
         self,
         documents: List[Dict],
@@ -43,6 +184,12 @@ class QuestionGenerator:
         if not documents:
             return self._get_default_questions()
 
+        key = (self._fingerprint(documents), max_questions)
+        cached = self._question_cache.get(key)
+        if cached is not None:
+            self._question_cache.move_to_end(key)
+            return list(cached)
+
         # Extract topics from documents
         topics = self._extract_topics(documents)
 
@@ -54,8 +201,30 @@ class QuestionGenerator:
 
         # Remove duplicates and limit
         unique_questions = list(dict.fromkeys(questions))[:max_questions]
+        if not unique_questions:
+            unique_questions = self._get_default_questions()
+
+        self._question_cache[key] = unique_questions
+        if len(self._question_cache) > self.QUESTION_CACHE_SIZE:
+            self._question_cache.popitem(last=False)
 
-        return unique_questions if unique_questions else self._get_default_questions()
+        return list(unique_questions)
+
+    @staticmethod
+    def _fingerprint(documents: List[Dict]) -> bytes:
+        """
+        Hash the document fields that question generation reads.
+
+        Only the first 10 documents feed topic and question extraction, so
+        the fingerprint covers their content and category alone.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        for doc in documents[:10]:
+            digest.update(doc.get('page_content', '').encode('utf-8'))
+            digest.update(b'\0')
+            digest.update(str(doc.get('metadata', {}).get('category', '')).encode('utf-8'))
+            digest.update(b'\0')
+        return digest.digest()
 
     def generate_follow_ups(
         self,
@@ -78,9 +247,10 @@ class QuestionGenerator:
 
         # Extract main topic from query
         query_lower = user_query.lower()
+        terms = _query_terms(query_lower)
 
         # Pattern-based follow-ups
-        if any(word in query_lower for word in ['what is', 'what are', 'define']):
+        if not terms.isdisjoint(_DEFINITION_TERMS):
             # User asked "what is X" -> suggest "how to use X", "examples of X"
             topic = self._extract_main_topic(user_query)
             if topic:
@@ -88,7 +258,7 @@ class QuestionGenerator:
                 follow_ups.append(f"What are examples of {topic}?")
                 follow_ups.append(f"What are the benefits of {topic}?")
 
-        elif any(word in query_lower for word in ['how to', 'how do', 'how does']):
+        elif not terms.isdisjoint(_HOW_TO_TERMS):
             # User asked "how to X" -> suggest "why X", "alternatives to X"
             topic = self._extract_main_topic(user_query)
             if topic:
@@ -96,7 +266,7 @@ class QuestionGenerator:
                 follow_ups.append(f"What are alternatives to {topic}?")
                 follow_ups.append(f"What are common {topic} mistakes?")
 
-        elif any(word in query_lower for word in ['why', 'reason']):
+        elif not terms.isdisjoint(_WHY_TERMS):
             # User asked "why" -> suggest practical applications
             topic = self._extract_main_topic(user_query)
             if topic:
@@ -104,8 +274,8 @@ class QuestionGenerator:
                 follow_ups.append(f"What are {topic} best practices?")
 
         # Extract topics from response for related questions
-        response_topics = self._extract_topics_from_text(bot_response)
-        for topic in response_topics[:2]:  # Top 2 topics
+        response_topics = self._extract_topics_from_text(bot_response, max_topics=2)
+        for topic in response_topics:  # Top 2 topics
             if topic.lower() not in query_lower:
                 follow_ups.append(f"Tell me more about {topic}")
                 follow_ups.append(f"How does {topic} work?")
@@ -133,19 +303,18 @@ class QuestionGenerator:
         if len(partial_query) < 3:
             return []
 
-        suggestions = []
         partial_lower = partial_query.lower()
 
         # Get common questions
         common_questions = self.generate_from_documents(documents, max_questions=20)
 
-        # Filter questions that start with or contain partial query
-        for question in common_questions:
-            question_lower = question.lower()
-            if question_lower.startswith(partial_lower):
-                suggestions.append(question)
-            elif partial_lower in question_lower and len(suggestions) < max_suggestions:
-                suggestions.append(question)
+        # Reindex only when the question list changes
+        index = self._autocomplete_index
+        if index is None or index.questions != common_questions:
+            index = self._autocomplete_index = _AutocompleteIndex(common_questions)
+
+        # Questions that start with or contain partial query, in order
+        suggestions = index.search(partial_lower, max_suggestions)
 
         # If no matches, suggest question completions
         if not suggestions:
@@ -155,75 +324,54 @@ class QuestionGenerator:
 
     def _extract_topics(self, documents: List[Dict]) -> List[str]:
         """Extract main topics from documents."""
-        topics = []
-
-        for doc in documents[:10]:  # First 10 docs
-            content = doc.get('page_content', '')
+        docs = documents[:10]  # First 10 docs
 
-            # Extract capitalized words (potential topics)
-            capitalized = re.findall(r'\b[A-Z][A-Za-z]{2,}\b', content)
-            topics.extend(capitalized)
+        # Extract capitalized words (potential topics) in one pass over all docs
+        content = _DOC_SEPARATOR.join(doc.get('page_content', '') for doc in docs)
+        topic_counts = Counter(_CAPITALIZED_RE.findall(content))
 
-            # Extract from metadata
-            metadata = doc.get('metadata', {})
-            if 'category' in metadata:
-                topics.append(metadata['category'])
+        # Extract from metadata
+        topic_counts.update(
+            doc['metadata']['category'] for doc in docs
+            if 'category' in doc.get('metadata', {})
+        )
 
-        # Count frequency and return most common
-        topic_counts = Counter(topics)
+        # Return most common
         common_topics = [topic for topic, count in topic_counts.most_common(10)]
 
         return common_topics
 
-    def _extract_topics_from_text(self, text: str) -> List[str]:
-        """Extract topics from text."""
+    def _extract_topics_from_text(self, text: str, max_topics: int = 5) -> List[str]:
+        """Extract the most frequent topics from text."""
         # Extract capitalized words (proper nouns)
-        topics = re.findall(r'\b[A-Z][A-Za-z]{2,}\b', text)
+        topics = _CAPITALIZED_RE.findall(text)
 
-        # Count frequency
+        # Count frequency; most_common(n) takes a heap top-n instead of a full sort
         topic_counts = Counter(topics)
-        return [topic for topic, count in topic_counts.most_common(5)]
+        return [topic for topic, count in topic_counts.most_common(max_topics)]
 
     def _extract_main_topic(self, query: str) -> str:
         """Extract main topic from query."""
-        # Remove common question words
-        topic = query.lower()
-        remove_words = [
-            'what is', 'what are', 'how to', 'how do', 'how does',
-            'why is', 'why does', 'where can', 'when should',
-            'can i', 'should i', 'tell me about', '?'
-        ]
-
-        for word in remove_words:
-            topic = topic.replace(word, '')
-
-        return topic.strip()
+        # Remove common question words in a single pass
+        return _QUESTION_WORDS_RE.sub('', query.lower()).strip()
 
     def _generate_questions_from_topics(self, topics: List[str]) -> List[str]:
         """Generate questions based on extracted topics."""
-        questions = []
-
-        for topic in topics[:5]:  # Top 5 topics
-            questions.append(f"What is {topic}?")
-            questions.append(f"How to use {topic}?")
-            questions.append(f"What are {topic} best practices?")
-
-        return questions
+        return [
+            template(topic)
+            for topic in topics[:5]  # Top 5 topics
+            for template in _TOPIC_TEMPLATES
+        ]
 
     def _extract_existing_questions(self, documents: List[Dict]) -> List[str]:
         """Extract questions that appear in documents."""
-        questions = []
-
-        for doc in documents[:5]:
-            content = doc.get('page_content', '')
-
-            # Find sentences ending with ?
-            potential_questions = re.findall(r'([A-Z][^.!?]*\?)', content)
+        # Find sentences ending with ? in one pass over the first docs
+        content = _DOC_SEPARATOR.join(doc.get('page_content', '') for doc in documents[:5])
 
-            for q in potential_questions:
-                # Filter out too long or too short
-                if 10 < len(q) < 100:
-                    questions.append(q.strip())
+        questions = [
+            q.strip() for q in _QUESTION_RE.findall(content)
+            if 10 < len(q) < 100  # Filter out too long or too short
+        ]
 
         return questions[:5]
 
@@ -314,8 +462,6 @@ class PeopleAlsoAsked:
         Returns:
             List of related questions
         """
-        paa_questions = []
-
         # Extract main topic
         topic = self._extract_topic(user_query)
 
@@ -323,58 +469,30 @@ class PeopleAlsoAsked:
             return []
 
         # Determine query type
-        query_lower = user_query.lower()
+        terms = _query_terms(user_query.lower())
 
-        if any(word in query_lower for word in ['what is', 'what are', 'define']):
+        if not terms.isdisjoint(_DEFINITION_TERMS):
             # Definition query -> suggest usage, examples
-            paa_questions.extend([
-                f"How to use {topic}?",
-                f"What are {topic} examples?",
-                f"What are the benefits of {topic}?",
-                f"When should I use {topic}?",
-            ])
-
-        elif any(word in query_lower for word in ['how to', 'how do']):
+            templates = _PAA_DEFINITION_TEMPLATES
+
+        elif not terms.isdisjoint(_HOW_TO_TERMS):
             # How-to query -> suggest examples, best practices
-            paa_questions.extend([
-                f"What are {topic} best practices?",
-                f"What are common {topic} mistakes?",
-                f"Can you show {topic} examples?",
-                f"What is {topic}?",
-            ])
-
-        elif any(word in query_lower for word in ['why', 'reason']):
+            templates = _PAA_HOW_TO_TEMPLATES
+
+        elif not terms.isdisjoint(_WHY_TERMS):
             # Why query -> suggest how-to, benefits
-            paa_questions.extend([
-                f"How to implement {topic}?",
-                f"What are the benefits of {topic}?",
-                f"What is {topic}?",
-                f"When should I use {topic}?",
-            ])
+            templates = _PAA_WHY_TEMPLATES
 
         else:
             # Generic questions
-            paa_questions.extend([
-                f"What is {topic}?",
-                f"How to use {topic}?",
-                f"What are {topic} examples?",
-                f"Why use {topic}?",
-            ])
+            templates = _PAA_GENERIC_TEMPLATES
 
-        return paa_questions[:max_questions]
+        return [template(topic) for template in templates[:max_questions]]
 
     def _extract_topic(self, query: str) -> str:
         """Extract main topic from query."""
-        # Remove question words
-        topic = query.lower()
-        remove_words = [
-            'what is', 'what are', 'how to', 'how do', 'how does',
-            'why is', 'why does', 'where can', 'when should',
-            'can i', 'should i', 'tell me about', '?', 'the', 'a', 'an'
-        ]
-
-        for word in remove_words:
-            topic = topic.replace(word, '')
+        # Remove question words and articles in a single pass
+        topic = _TOPIC_STOP_RE.sub('', query.lower())
 
         # Capitalize first letter
         topic = topic.strip()
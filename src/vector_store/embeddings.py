@@ -1,26 +1,190 @@
 """Embedding generation using sentence transformers."""
 
-from typing import List
+from typing import Callable, List, Optional, Tuple
+from concurrent.futures import Future
+import threading
+import time
 from sentence_transformers import SentenceTransformer
 import numpy as np
+import torch
+from ..cache.embedding_cache import EmbeddingCache
+
+
+class EmbeddingBatcher:
+    """
+    Coalesce concurrent single-text encodes into batched model calls.
+
+    A background thread collects texts submitted within a short window
+    (or until the batch is full) and encodes them in one call, so
+    concurrent callers share one forward pass instead of each running a
+    batch of one.
+    """
+
+    def __init__(
+        self,
+        encode: Callable[[List[str]], np.ndarray],
+        max_batch_size: int = 32,
+        window_seconds: float = 0.01
+    ):
+        """
+        Initialize the batcher and start its worker thread.
+
+        Args:
+            encode: Function embedding a list of texts, one row per text
+            max_batch_size: Largest number of texts encoded together
+            window_seconds: How long the first text waits for others to join
+        """
+        self._encode = encode
+        self.max_batch_size = max_batch_size
+        self.window_seconds = window_seconds
+
+        self._pending: List[Tuple[str, Future]] = []
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, text: str) -> Future:
+        """
+        Queue a text for the next batch.
+
+        Args:
+            text: Input text
+
+        Returns:
+            Future resolving to the text's embedding vector
+        """
+        future: Future = Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Embedding batcher is closed")
+            self._pending.append((text, future))
+            # Wake the worker for a new window, or early once the batch is full
+            if len(self._pending) == 1 or len(self._pending) >= self.max_batch_size:
+                self._condition.notify()
+        return future
+
+    def close(self):
+        """Encode what is still queued, then stop the worker thread."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+
+    def _run(self):
+        """Worker loop: wait for texts, let the window fill, encode the batch."""
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+
+                deadline = time.monotonic() + self.window_seconds
+                while len(self._pending) < self.max_batch_size and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+
+                batch = self._pending[:self.max_batch_size]
+                del self._pending[:self.max_batch_size]
+
+            try:
+                embeddings = self._encode([text for text, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, future), embedding in zip(batch, embeddings):
+                future.set_result(embedding)
 
 
 class EmbeddingGenerator:
     """Generate embeddings for text using sentence transformers."""
 
-    def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2"):
+    def __init__(
+        self,
+        model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+        precision: str = "auto",
+        batch_window_ms: float = 0,
+        backend: str = "torch"
+    ):
         """
         Initialize embedding generator.
 
         Args:
             model_name: Name of the sentence transformer model
+            precision: "fp32", "fp16" (CUDA only), "int8" (dynamic quantization,
+                CPU only) or "auto" (fp16 on CUDA, fp32 on CPU)
+            batch_window_ms: If positive, coalesce concurrent embed_text calls
+                arriving within this many milliseconds into one model call
+            backend: Inference runtime: "torch", "onnx" (ONNX Runtime) or
+                "openvino"; the latter two need sentence-transformers>=3.2 with
+                its optimum extras installed
         """
+        if backend not in ("torch", "onnx", "openvino"):
+            raise ValueError(f"Unsupported embedding backend: {backend}")
+
         self.model_name = model_name
-        print(f"Loading embedding model: {model_name}")
-        self.model = SentenceTransformer(model_name)
+        self.backend = backend
+        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        print(f"Loading embedding model: {model_name} ({self.device}, {backend})")
+        self.model = SentenceTransformer(model_name, device=self.device, **self._backend_kwargs())
+        self.precision = self._resolve_precision(precision)
+        # Half precision doubles tensor-core throughput; CPU kernels gain nothing from it
+        self.half_precision = self.precision == "fp16"
+        if self.half_precision:
+            self.model.half()
+        elif self.precision == "int8":
+            # int8 weights for every Linear layer; activations quantized on the fly
+            torch.quantization.quantize_dynamic(
+                self.model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+            )
         self.embedding_dimension = self.model.get_sentence_embedding_dimension()
         print(f"✓ Model loaded. Embedding dimension: {self.embedding_dimension}")
 
+        # Optional cache consulted by embed_text (set by the owner once the model is loaded)
+        self.cache: Optional[EmbeddingCache] = None
+
+        # Only worth it when several threads embed queries at once
+        self.batcher: Optional[EmbeddingBatcher] = None
+        if batch_window_ms > 0:
+            self.batcher = EmbeddingBatcher(
+                lambda texts: self.model.encode(texts, batch_size=64, convert_to_numpy=True),
+                window_seconds=batch_window_ms / 1000
+            )
+
+    def _backend_kwargs(self) -> dict:
+        """SentenceTransformer arguments selecting the inference runtime."""
+        if self.backend == "torch":
+            return {}
+        kwargs = {"backend": self.backend}
+        if self.backend == "onnx" and self.device == "cuda":
+            kwargs["model_kwargs"] = {"provider": "CUDAExecutionProvider"}
+        return kwargs
+
+    def _resolve_precision(self, precision: str) -> str:
+        """Pick the inference precision supported on the current device and backend."""
+        if precision not in ("auto", "fp32", "fp16", "int8"):
+            raise ValueError(f"Unsupported precision: {precision}")
+
+        if self.backend != "torch":
+            # half() and dynamic quantization only apply to torch modules
+            if precision not in ("auto", "fp32"):
+                print(f"⚠ {precision} inference needs the torch backend; using fp32")
+            return "fp32"
+        if precision == "auto":
+            return "fp16" if self.device == "cuda" else "fp32"
+        if precision == "fp16" and self.device != "cuda":
+            print("⚠ fp16 inference needs CUDA; using fp32")
+            return "fp32"
+        if precision == "int8" and self.device != "cpu":
+            print("⚠ int8 dynamic quantization runs on CPU only; using fp16")
+            return "fp16"
+        return precision
+
     def embed_text(self, text: str) -> np.ndarray:
         """
         Generate embedding for a single text.
@@ -31,6 +195,19 @@ class EmbeddingGenerator:
         Returns:
             Embedding vector as numpy array
         """
+        if self.cache is None:
+            return self._encode_one(text)
+
+        embedding = self.cache.get(text)
+        if embedding is None:
+            embedding = self._encode_one(text)
+            self.cache.put(text, embedding)
+        return embedding
+
+    def _encode_one(self, text: str) -> np.ndarray:
+        """Encode a single text, sharing a batch with concurrent callers if enabled."""
+        if self.batcher is not None:
+            return self.batcher.submit(text).result()
         return self.model.encode(text, convert_to_numpy=True)
 
     def embed_batch(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
@@ -42,8 +219,18 @@ class EmbeddingGenerator:
             batch_size: Batch size for processing
 
         Returns:
-            Array of embedding vectors
+            Array of embedding vectors (unit length float16 on GPU)
         """
+        if self.half_precision:
+            # Normalize on the device and copy back once, already in float16
+            return self.model.encode(
+                texts,
+                batch_size=max(batch_size, 64),
+                convert_to_tensor=True,
+                normalize_embeddings=True,
+                show_progress_bar=len(texts) > 100
+            ).cpu().numpy()
+
         return self.model.encode(
             texts,
             batch_size=batch_size,
@@ -51,6 +238,36 @@ class EmbeddingGenerator:
             show_progress_bar=len(texts) > 100
         )
 
+    def embed_batch_into(
+        self,
+        texts: List[str],
+        out: np.ndarray,
+        start: int = 0,
+        batch_size: int = 32,
+        chunk_size: int = 1024
+    ):
+        """
+        Generate embeddings directly into rows of a preallocated array.
+
+        Texts are encoded chunk by chunk, so peak memory is the output
+        array plus one chunk rather than a second full copy of all
+        embeddings. Chunks are cut from the texts sorted by length, so
+        each batch pads to a similar length; the model only sorts within
+        a single encode call.
+
+        Args:
+            texts: List of input texts
+            out: Array to write into, shape (>= start + len(texts), dimension)
+            start: First row of out to write
+            batch_size: Batch size for processing
+            chunk_size: Texts encoded per model call
+        """
+        order = np.argsort(np.fromiter(map(len, texts), dtype=np.int64, count=len(texts)), kind='stable')
+        for offset in range(0, len(texts), chunk_size):
+            rows = order[offset:offset + chunk_size]
+            # Scatter the chunk back to the texts' original rows
+            out[rows + start] = self.embed_batch([texts[i] for i in rows], batch_size)
+
     def get_dimension(self) -> int:
         """Get the embedding dimension."""
         return self.embedding_dimension
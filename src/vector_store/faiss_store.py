@@ -1,38 +1,310 @@
 """FAISS vector store implementation."""
 
 import os
+import json
+import math
 import pickle
-from typing import List, Tuple, Dict, Any
+import threading
+from typing import List, Tuple, Dict, Any, Optional
 import faiss
 import numpy as np
 from langchain.docstore.document import Document
 
+# Let batched searches use every core unless the operator pinned OpenMP
+if "OMP_NUM_THREADS" not in os.environ:
+    faiss.omp_set_num_threads(os.cpu_count() or 1)
+
+# Map the stored vectors/codes of saved indexes instead of reading them into
+# the heap (faiss >= 1.10; older versions read the whole file)
+_MMAP_FLAGS = (
+    faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY if hasattr(faiss, "IO_FLAG_MMAP_IFC") else None
+)
+
 
 class FAISSVectorStore:
     """Vector store using FAISS for similarity search."""
 
-    def __init__(self, embedding_dimension: int, index_path: str = None):
+    # Corpora at least this large are searched with an HNSW graph instead of
+    # an exact flat scan
+    HNSW_THRESHOLD = 10_000
+    HNSW_M = 32
+    HNSW_EF_CONSTRUCTION = 200
+    HNSW_EF_SEARCH = 64
+    # Corpora at least this large are compressed with IVF-PQ instead: HNSW
+    # keeps every float32 vector in RAM, PQ codes take d/8 bytes per vector
+    IVFPQ_THRESHOLD = 1_000_000
+    IVF_NPROBE = 16
+    # PQ and SQ8 scores are approximate: fetch this many times k and re-rank
+    # exactly against the stored float16 vectors
+    RERANK_FACTOR = 4
+    # Training vectors sampled per IVF list
+    IVF_TRAIN_PER_LIST = 64
+    # Training vectors sampled for scalar quantizer ranges
+    SQ_TRAIN_SIZE = 100_000
+    # Largest k FAISS GPU indexes can return
+    GPU_MAX_K = 2048
+
+    def __init__(
+        self,
+        embedding_dimension: int,
+        index_path: str = None,
+        use_gpu: bool = False,
+        index_type: str = "auto",
+        ef_search: Optional[int] = None,
+        compression: str = "none"
+    ):
         """
         Initialize FAISS vector store.
 
         Args:
             embedding_dimension: Dimension of embeddings
             index_path: Path to save/load the index
+            use_gpu: Whether to serve unfiltered searches from a GPU copy of
+                the index (needs faiss-gpu and a visible GPU)
+            index_type: "auto" to pick flat, HNSW or IVF-PQ by corpus size, or
+                "hnsw" to always use an HNSW graph
+            ef_search: HNSW candidate list length per search (higher trades
+                latency for recall; defaults to HNSW_EF_SEARCH)
+            compression: "none", or "sq8" to store flat and HNSW vectors as
+                8-bit scalar-quantized codes (4x less index memory)
         """
+        if index_type not in ("auto", "hnsw"):
+            raise ValueError(f"Unsupported FAISS index type: {index_type}")
+        if compression not in ("none", "sq8"):
+            raise ValueError(f"Unsupported FAISS compression: {compression}")
         self.embedding_dimension = embedding_dimension
         self.index_path = index_path
         self.index = None
-        self.documents: List[Document] = []
-        self.document_embeddings: np.ndarray = None
+        # A memory-mapped index is read-only; see _own_index()
+        self._index_mapped = False
+        self.index_type = index_type
+        self.ef_search = ef_search or self.HNSW_EF_SEARCH
+        self.compression = compression
+
+        # The CPU index stays authoritative; the GPU copy is rebuilt lazily after changes
+        self.use_gpu = use_gpu and hasattr(faiss, "index_cpu_to_all_gpus") and faiss.get_num_gpus() > 0
+        if use_gpu and not self.use_gpu:
+            print("⚠ No FAISS GPU support available; searching on CPU")
+        self._gpu_index = None
+        self._gpu_ids: Optional[np.ndarray] = None
+        # Documents are stored as parallel content/metadata lists indexed by
+        # document id; ids stay stable and deleted slots hold None in both
+        self._contents: List[Optional[str]] = []
+        self._metadatas: List[Optional[Dict[str, Any]]] = []
+        # Document objects built on demand for search results
+        self._doc_views: Dict[int, Document] = {}
+        # Embedding rows live in a geometrically grown buffer; see document_embeddings
+        self._emb_buf: Optional[np.ndarray] = None
+        self._emb_len = 0
+        self._deleted: set = set()
+        # key -> value -> sorted int64 document positions; rebuilt lazily on change
+        self._meta_index: Optional[Dict[str, Dict[Any, np.ndarray]]] = None
+        # Vectors the scalar quantizer ranges were last trained on
+        self._sq_trained_on = 0
+        # Per-thread (1, d) float32 query buffers reused across searches
+        self._query_buffers = threading.local()
 
         # Initialize or load index
         index_file = os.path.join(index_path, "index.faiss") if index_path else None
         if index_file and os.path.exists(index_file):
             self.load()
         else:
-            self.index = faiss.IndexFlatL2(embedding_dimension)
+            self.index = self._create_index()
             print(f"✓ Created new FAISS index with dimension {embedding_dimension}")
 
+    @property
+    def documents(self) -> List[Optional[Document]]:
+        """All stored documents by id (None for deleted ids)."""
+        return [
+            None if content is None else self._document(idx)
+            for idx, content in enumerate(self._contents)
+        ]
+
+    def _document(self, idx: int) -> Document:
+        """Document view of a stored id, built once and reused."""
+        doc = self._doc_views.get(idx)
+        if doc is None:
+            doc = Document(page_content=self._contents[idx], metadata=self._metadatas[idx])
+            self._doc_views[idx] = doc
+        return doc
+
+    @property
+    def document_embeddings(self) -> Optional[np.ndarray]:
+        """Stored embeddings, one row per document id (a view of the buffer)."""
+        if self._emb_buf is None:
+            return None
+        return self._emb_buf[:self._emb_len]
+
+    @document_embeddings.setter
+    def document_embeddings(self, embeddings: Optional[np.ndarray]):
+        self._emb_buf = embeddings
+        self._emb_len = 0 if embeddings is None else len(embeddings)
+
+    def _append_embeddings(self, vectors: np.ndarray):
+        """
+        Append embedding rows, doubling the buffer when it is full.
+
+        Growing geometrically keeps incremental ingestion at O(N * d) total
+        copying instead of re-copying all rows on every batch.
+
+        Args:
+            vectors: Unit-length embeddings to store
+        """
+        needed = self._emb_len + len(vectors)
+        capacity = 0 if self._emb_buf is None else len(self._emb_buf)
+        if needed > capacity:
+            buffer = np.empty((max(needed, 2 * capacity), self.embedding_dimension), dtype=np.float16)
+            buffer[:self._emb_len] = self.document_embeddings
+            self._emb_buf = buffer
+        self._emb_buf[self._emb_len:needed] = vectors
+        self._emb_len = needed
+
+    def _create_index(self, num_vectors: int = 0):
+        """
+        Create an empty index suited to the corpus size.
+
+        Args:
+            num_vectors: Number of vectors the index will hold
+
+        Returns:
+            Exact IndexFlatIP for small corpora, approximate IndexHNSWFlat for
+            larger ones and an (untrained) IVF-PQ index for very large ones,
+            all using inner product over unit vectors and wrapped in an
+            IndexIDMap2 keyed by document id. With SQ8 compression the flat
+            and HNSW tiers store (untrained) 8-bit codes instead
+        """
+        tier = self._index_tier(num_vectors)
+        sq8 = self.compression == "sq8"
+        if tier == 0:
+            if sq8:
+                return faiss.IndexIDMap2(faiss.IndexScalarQuantizer(
+                    self.embedding_dimension, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT
+                ))
+            return faiss.IndexIDMap2(faiss.IndexFlatIP(self.embedding_dimension))
+
+        if tier == 2:
+            # ~4 * sqrt(N) lists; 8-bit codes over sub-vectors of (about) 8 dims
+            nlist = int(4 * math.sqrt(num_vectors))
+            index = faiss.index_factory(
+                self.embedding_dimension,
+                f"IVF{nlist},PQ{self._pq_subquantizers()}x8",
+                faiss.METRIC_INNER_PRODUCT
+            )
+            faiss.extract_index_ivf(index).nprobe = self.IVF_NPROBE
+            return faiss.IndexIDMap2(index)
+
+        if sq8:
+            index = faiss.IndexHNSWSQ(
+                self.embedding_dimension, faiss.ScalarQuantizer.QT_8bit, self.HNSW_M,
+                faiss.METRIC_INNER_PRODUCT
+            )
+        else:
+            index = faiss.IndexHNSWFlat(
+                self.embedding_dimension, self.HNSW_M, faiss.METRIC_INNER_PRODUCT
+            )
+        index.hnsw.efConstruction = self.HNSW_EF_CONSTRUCTION
+        index.hnsw.efSearch = self.ef_search
+        return faiss.IndexIDMap2(index)
+
+    def _index_tier(self, num_vectors: int) -> int:
+        """Index type for a corpus size: 0 flat, 1 HNSW, 2 IVF-PQ."""
+        if self.index_type == "hnsw":
+            return 1
+        if num_vectors >= self.IVFPQ_THRESHOLD:
+            return 2
+        return 1 if num_vectors >= self.HNSW_THRESHOLD else 0
+
+    def _current_tier(self) -> int:
+        """Index type of the current index, as in _index_tier()."""
+        if self._is_ivf():
+            return 2
+        return 1 if self._is_hnsw() else 0
+
+    def _pq_subquantizers(self) -> int:
+        """Number of PQ sub-vectors: about one per 8 dims, dividing the dimension."""
+        d = self.embedding_dimension
+        return next(m for m in range(max(d // 8, 1), 0, -1) if d % m == 0)
+
+    def _base_index(self):
+        """The index wrapped by the id map."""
+        return faiss.downcast_index(self.index.index)
+
+    def _is_hnsw(self) -> bool:
+        """Whether the current index is an approximate HNSW graph."""
+        return isinstance(self._base_index(), faiss.IndexHNSW)
+
+    def _is_ivf(self) -> bool:
+        """Whether the current index is an inverted-file (IVF) index."""
+        return isinstance(self._base_index(), faiss.IndexIVF)
+
+    def _is_sq(self) -> bool:
+        """Whether the current index stores scalar-quantized (SQ8) codes."""
+        return isinstance(self._base_index(), (faiss.IndexScalarQuantizer, faiss.IndexHNSWSQ))
+
+    def _is_quantized(self) -> bool:
+        """Whether the current index scores compressed (PQ or SQ) codes."""
+        return self._is_ivf() or self._is_sq()
+
+    def _own_index(self):
+        """Copy a memory-mapped index into memory so it can be modified."""
+        if self._index_mapped:
+            self.index = faiss.deserialize_index(faiss.serialize_index(self.index))
+            self._index_mapped = False
+
+    def _rebuild_index(self):
+        """Rebuild the index from the stored embeddings of live documents."""
+        live_ids = np.array(
+            [i for i, content in enumerate(self._contents) if content is not None], dtype=np.int64
+        )
+        self.index = self._create_index(len(live_ids))
+        self._index_mapped = False
+        self._gpu_index = None
+        if len(live_ids) > 0:
+            vectors = self.document_embeddings[live_ids].astype(np.float32)
+            if not self.index.is_trained:
+                self._train_index(vectors)
+                self._sq_trained_on = len(vectors)
+            self.index.add_with_ids(vectors, live_ids)
+
+    def _train_index(self, vectors: np.ndarray):
+        """Train IVF centroids, PQ codebooks or SQ ranges on a random sample of the vectors."""
+        if self._is_ivf():
+            sample_size = faiss.extract_index_ivf(self._base_index()).nlist * self.IVF_TRAIN_PER_LIST
+        else:
+            sample_size = self.SQ_TRAIN_SIZE
+        sample_size = min(len(vectors), sample_size)
+        sample = np.random.default_rng(0).choice(len(vectors), sample_size, replace=False)
+        self.index.train(vectors[np.sort(sample)])
+
+    @staticmethod
+    def _unit_vectors(embeddings: np.ndarray) -> np.ndarray:
+        """Float32 copy of the embeddings scaled to unit length, as a 2D array."""
+        vectors = np.array(embeddings, dtype=np.float32, ndmin=2)
+        faiss.normalize_L2(vectors)
+        return vectors
+
+    def _query_vector(self, query_embedding: np.ndarray) -> np.ndarray:
+        """Unit-length query in this thread's reusable (1, d) float32 buffer."""
+        buffer = getattr(self._query_buffers, 'vector', None)
+        if buffer is None:
+            buffer = np.empty((1, self.embedding_dimension), dtype=np.float32)
+            self._query_buffers.vector = buffer
+        # Cast and copy in one pass; the (read-only) source is never modified
+        np.copyto(buffer, np.reshape(query_embedding, (1, -1)), casting='same_kind')
+        faiss.normalize_L2(buffer)
+        return buffer
+
+    def _search_params(self, k: int, selector=None):
+        """FAISS search parameters for the current index type."""
+        if self._is_hnsw():
+            # The candidate list must be at least k long to return k results
+            return faiss.SearchParametersHNSW(sel=selector, efSearch=max(self.ef_search, k))
+        if self._is_ivf():
+            return faiss.SearchParametersIVF(sel=selector, nprobe=self.IVF_NPROBE)
+        if selector is not None:
+            return faiss.SearchParameters(sel=selector)
+        return None
+
     def add_documents(self, documents: List[Document], embeddings: np.ndarray):
         """
         Add documents and their embeddings to the vector store.
@@ -44,25 +316,45 @@ class FAISSVectorStore:
         if len(documents) != len(embeddings):
             raise ValueError("Number of documents must match number of embeddings")
 
-        # Add embeddings to FAISS index
-        self.index.add(embeddings.astype('float32'))
+        # Normalize once so inner product equals cosine similarity
+        vectors = self._unit_vectors(embeddings)
 
         # Store documents
-        self.documents.extend(documents)
-
-        # Store embeddings for reference
-        if self.document_embeddings is None:
-            self.document_embeddings = embeddings
+        start_id = len(self._contents)
+        self._contents.extend(doc.page_content for doc in documents)
+        self._metadatas.extend(doc.metadata for doc in documents)
+        self._meta_index = None
+
+        # Store embeddings for reference (half precision is plenty for rebuilds)
+        self._append_embeddings(vectors)
+
+        # Add embeddings to FAISS index, moving to HNSW once the corpus outgrows a
+        # flat scan and to IVF-PQ once full vectors no longer fit comfortably
+        # (a forced HNSW store also upgrades a flat index saved in auto mode).
+        # SQ8 indexes are rebuilt whenever the corpus doubles, so their value
+        # ranges are retrained on a representative sample at amortized O(N)
+        total = self.index.ntotal + len(documents)
+        if (
+            self._index_tier(total) > self._current_tier()
+            or not self.index.is_trained
+            or (self._is_sq() and total > 2 * self._sq_trained_on)
+        ):
+            self._rebuild_index()
+            print(f"✓ Built {type(self._base_index()).__name__} index for {self.index.ntotal} vectors")
         else:
-            self.document_embeddings = np.vstack([self.document_embeddings, embeddings])
+            ids = np.arange(start_id, start_id + len(documents), dtype=np.int64)
+            self._own_index()
+            self.index.add_with_ids(vectors, ids)
+            self._gpu_index = None
 
         print(f"✓ Added {len(documents)} documents to vector store")
-        print(f"  Total documents: {len(self.documents)}")
+        print(f"  Total documents: {self._live_count()}")
 
     def search(
         self,
         query_embedding: np.ndarray,
-        k: int = 5
+        k: int = 5,
+        filter_metadata: Dict[str, Any] = None
     ) -> List[Tuple[Document, float]]:
         """
         Search for similar documents.
@@ -70,35 +362,234 @@ class FAISSVectorStore:
         Args:
             query_embedding: Query embedding vector
             k: Number of results to return
+            filter_metadata: Optional metadata key-value pairs results must match
 
         Returns:
-            List of (Document, distance) tuples
+            List of (Document, distance) tuples; distances are squared L2
+            between unit vectors (0 = identical, 4 = opposite)
         """
         if self.index.ntotal == 0:
             return []
 
-        # Ensure query is 2D array
-        if query_embedding.ndim == 1:
-            query_embedding = query_embedding.reshape(1, -1)
+        query_embedding = self._query_vector(query_embedding)
+
+        if filter_metadata:
+            allowed_ids = self._filter_ids(filter_metadata)
+            if allowed_ids is None:
+                # Filter values the index can't answer: post-filter a full search
+                results = self._search(query_embedding, self.index.ntotal)
+                return self._filter_results(results, filter_metadata)[:k]
+            if len(allowed_ids) == 0:
+                return []
+
+            # Push the filter into FAISS so only matching vectors are scored
+            return self._search(
+                query_embedding, min(k, len(allowed_ids)), faiss.IDSelectorBatch(allowed_ids)
+            )
+
+        return self._search(query_embedding, k, self._tombstone_selector())
+
+    def search_batch(
+        self,
+        query_embeddings: np.ndarray,
+        k: int = 5,
+        filter_metadata: Dict[str, Any] = None
+    ) -> List[List[Tuple[Document, float]]]:
+        """
+        Search for several queries in one FAISS call.
+
+        Args:
+            query_embeddings: Query embedding vectors, one per row
+            k: Number of results to return per query
+            filter_metadata: Optional metadata key-value pairs results must match
+
+        Returns:
+            One list of (Document, distance) tuples per query, as from search()
+        """
+        query_embeddings = self._unit_vectors(query_embeddings)
+        if self.index.ntotal == 0:
+            return [[] for _ in range(len(query_embeddings))]
+
+        selector = None
+        if filter_metadata:
+            allowed_ids = self._filter_ids(filter_metadata)
+            if allowed_ids is None:
+                return [self.search(query, k, filter_metadata) for query in query_embeddings]
+            if len(allowed_ids) == 0:
+                return [[] for _ in range(len(query_embeddings))]
+            k = min(k, len(allowed_ids))
+            selector = faiss.IDSelectorBatch(allowed_ids)
+        else:
+            selector = self._tombstone_selector()
+
+        return self._search_many(query_embeddings, k, selector)
+
+    def _tombstone_selector(self):
+        """
+        Selector excluding deleted ids that are still in the index.
+
+        Only HNSW graphs keep deleted vectors; other indexes drop them in
+        delete_document(), so they need no selector (and keep the GPU path).
+        """
+        if not self._deleted or not self._is_hnsw():
+            return None
+        deleted = faiss.IDSelectorBatch(np.fromiter(self._deleted, dtype=np.int64))
+        return faiss.IDSelectorNot(deleted)
+
+    def _search(
+        self,
+        query_embedding: np.ndarray,
+        k: int,
+        selector=None
+    ) -> List[Tuple[Document, float]]:
+        """Run a FAISS search for one query and map ids back to documents."""
+        return self._search_many(query_embedding, k, selector)[0]
 
+    def _search_many(
+        self,
+        query_embeddings: np.ndarray,
+        k: int,
+        selector=None
+    ) -> List[List[Tuple[Document, float]]]:
+        """Run a FAISS search for a (n, d) query matrix and map ids back to documents."""
         # Search
         k = min(k, self.index.ntotal)  # Don't request more than available
-        distances, indices = self.index.search(query_embedding.astype('float32'), k)
+        fetch = min(k * self.RERANK_FACTOR, self.index.ntotal) if self._is_quantized() else k
+        if self._can_search_gpu(fetch, selector):
+            similarities, positions = self._gpu_replica().search(query_embeddings, fetch)
+            # The replica holds the base index; translate positions to document ids
+            indices = np.where(positions >= 0, self._gpu_ids[positions], -1)
+        else:
+            similarities, indices = self.index.search(
+                query_embeddings, fetch, params=self._search_params(fetch, selector)
+            )
+        if fetch > k:
+            similarities, indices = self._rerank(query_embeddings, indices, k)
+
+        # For unit vectors, squared L2 distance = 2 - 2 * inner product
+        distances = (2.0 - 2.0 * similarities.astype(np.float64)).tolist()
+
+        # -1 pads missing hits; HNSW can still return tombstoned ids
+        valid = indices >= 0
+        if self._deleted and self._is_hnsw():
+            valid &= ~np.isin(indices, np.fromiter(self._deleted, dtype=np.int64, count=len(self._deleted)))
 
         # Return documents with distances
-        results = []
-        for idx, distance in zip(indices[0], distances[0]):
-            if idx < len(self.documents):  # Safety check
-                results.append((self.documents[idx], float(distance)))
+        document = self._document
+        if valid.all():
+            return [
+                [(document(idx), distance) for idx, distance in zip(row_ids, row_distances)]
+                for row_ids, row_distances in zip(indices.tolist(), distances)
+            ]
+        return [
+            [(document(idx), distance) for idx, distance, keep in zip(row_ids, row_distances, row_valid) if keep]
+            for row_ids, row_distances, row_valid in zip(indices.tolist(), distances, valid.tolist())
+        ]
+
+    def _can_search_gpu(self, k: int, selector) -> bool:
+        """Whether a search can run on the GPU copy of the index."""
+        # GPU indexes take no id selectors and have no HNSW or flat SQ implementation
+        return (
+            self.use_gpu and selector is None and k <= self.GPU_MAX_K
+            and not self._is_hnsw() and self.index.ntotal > 0
+            and not self._is_sq()
+        )
+
+    def _gpu_replica(self):
+        """GPU copy of the base index (sharded over all GPUs), built on first use."""
+        if self._gpu_index is None:
+            self._gpu_ids = faiss.vector_to_array(self.index.id_map)
+            replica = faiss.index_cpu_to_all_gpus(self._base_index())
+            if self._is_ivf():
+                faiss.GpuParameterSpace().set_index_parameter(replica, "nprobe", self.IVF_NPROBE)
+            self._gpu_index = replica
+        return self._gpu_index
+
+    def _rerank(
+        self,
+        query_embeddings: np.ndarray,
+        candidates: np.ndarray,
+        k: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Exact inner products for candidate ids, keeping the top k per query."""
+        valid = candidates >= 0
+        vectors = self.document_embeddings[np.where(valid, candidates, 0)].astype(np.float32)
+        scores = np.einsum('nd,nfd->nf', query_embeddings, vectors)
+        scores[~valid] = -np.inf
+
+        order = np.argsort(-scores, axis=1, kind='stable')[:, :k]
+        return np.take_along_axis(scores, order, axis=1), np.take_along_axis(candidates, order, axis=1)
+
+    def _filter_ids(self, filters: Dict[str, Any]) -> Optional[np.ndarray]:
+        """
+        Positions of documents matching every metadata filter.
 
-        return results
+        Args:
+            filters: Metadata key-value pairs to match
 
-    def save(self, path: str = None):
+        Returns:
+            Sorted int64 document positions, or None if a filter value is
+            not indexable (None or unhashable)
+        """
+        if self._meta_index is None:
+            self._meta_index = self._build_metadata_index()
+
+        postings = []
+        for key, value in filters.items():
+            if value is None:
+                return None
+            try:
+                ids = self._meta_index.get(key, {}).get(value)
+            except TypeError:
+                return None
+            if ids is None:
+                return np.empty(0, dtype=np.int64)
+            postings.append(ids)
+
+        # Intersect from the shortest posting list up
+        postings.sort(key=len)
+        allowed = postings[0]
+        for ids in postings[1:]:
+            allowed = np.intersect1d(allowed, ids, assume_unique=True)
+        return allowed
+
+    def _build_metadata_index(self) -> Dict[str, Dict[Any, np.ndarray]]:
+        """Build the metadata inverted index over hashable values."""
+        index: Dict[str, Dict[Any, List[int]]] = {}
+        for position, metadata in enumerate(self._metadatas):
+            if metadata is None:
+                continue
+            for key, value in metadata.items():
+                try:
+                    index.setdefault(key, {}).setdefault(value, []).append(position)
+                except TypeError:
+                    continue  # Unhashable values are only matched by the fallback
+
+        return {
+            key: {value: np.asarray(ids, dtype=np.int64) for value, ids in values.items()}
+            for key, values in index.items()
+        }
+
+    @staticmethod
+    def _filter_results(
+        results: List[Tuple[Document, float]],
+        filters: Dict[str, Any]
+    ) -> List[Tuple[Document, float]]:
+        """Keep results whose metadata matches every filter."""
+        items = tuple(filters.items())
+        return [
+            (doc, score) for doc, score in results
+            if all(doc.metadata.get(key) == value for key, value in items)
+        ]
+
+    def save(self, path: str = None, include_metadata: bool = True):
         """
         Save the vector store to disk.
 
         Args:
             path: Directory path to save the store
+            include_metadata: Whether to save document metadata (documents
+                load with empty metadata otherwise)
         """
         save_path = path or self.index_path
 
@@ -107,27 +598,59 @@ class FAISSVectorStore:
 
         os.makedirs(save_path, exist_ok=True)
 
+        # Release our own mappings of the files about to be replaced: Windows
+        # refuses to replace a file that is still mapped
+        self._own_index()
+        if isinstance(self._emb_buf, np.memmap):
+            self.document_embeddings = np.array(self.document_embeddings)
+
+        # Every file is written aside and swapped in, so another process
+        # memory-mapping the old files never sees a truncated one
+        def replace_file(name: str, write):
+            target = os.path.join(save_path, name)
+            tmp_path = f"{target}.tmp"
+            write(tmp_path)
+            os.replace(tmp_path, target)
+
+        def write_embeddings(tmp_path: str):
+            with open(tmp_path, 'wb') as f:
+                np.save(f, embeddings)
+
+        def write_documents(tmp_path: str):
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'dimension': self.embedding_dimension,
+                    'contents': self._contents,
+                    'metadatas': self._metadatas if include_metadata else None
+                }, f, ensure_ascii=False, default=str)
+
         # Save FAISS index
-        index_file = os.path.join(save_path, "index.faiss")
-        faiss.write_index(self.index, index_file)
-
-        # Save documents and metadata
-        docs_file = os.path.join(save_path, "documents.pkl")
-        with open(docs_file, 'wb') as f:
-            pickle.dump({
-                'documents': self.documents,
-                'embeddings': self.document_embeddings,
-                'dimension': self.embedding_dimension
-            }, f)
+        replace_file("index.faiss", lambda tmp_path: faiss.write_index(self.index, tmp_path))
+
+        # Save embeddings as a raw array and documents as JSON
+        embeddings = self.document_embeddings
+        if embeddings is not None:
+            replace_file("embeddings.npy", write_embeddings)
+        elif os.path.exists(os.path.join(save_path, "embeddings.npy")):
+            os.remove(os.path.join(save_path, "embeddings.npy"))
+        replace_file("documents.json", write_documents)
+
+        # Drop the superseded pickle so it can't shadow this save
+        legacy_file = os.path.join(save_path, "documents.pkl")
+        if os.path.exists(legacy_file):
+            os.remove(legacy_file)
 
         print(f"✓ Saved vector store to {save_path}")
 
-    def load(self, path: str = None):
+    def load(self, path: str = None, mmap: bool = True):
         """
         Load the vector store from disk.
 
         Args:
             path: Directory path to load the store from
+            mmap: Whether to memory-map the index file, so loading is near
+                instant and processes share its pages; the index is copied
+                into memory on the first add or delete
         """
         load_path = path or self.index_path
 
@@ -136,28 +659,86 @@ class FAISSVectorStore:
 
         # Load FAISS index
         index_file = os.path.join(load_path, "index.faiss")
-        self.index = faiss.read_index(index_file)
+        self._index_mapped = mmap and _MMAP_FLAGS is not None
+        if self._index_mapped:
+            self.index = faiss.read_index(index_file, _MMAP_FLAGS)
+        else:
+            self.index = faiss.read_index(index_file)
+        self._sq_trained_on = self.index.ntotal
+        self._gpu_index = None
 
         # Load documents and metadata
-        docs_file = os.path.join(load_path, "documents.pkl")
-        with open(docs_file, 'rb') as f:
-            data = pickle.load(f)
-            self.documents = data['documents']
-            self.document_embeddings = data['embeddings']
+        docs_file = os.path.join(load_path, "documents.json")
+        if os.path.exists(docs_file):
+            with open(docs_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
             self.embedding_dimension = data['dimension']
+            self._set_documents(data['contents'], data['metadatas'])
+
+            # Memory-mapped: pages are read on demand and appends copy into a new buffer
+            embeddings_file = os.path.join(load_path, "embeddings.npy")
+            self.document_embeddings = (
+                np.load(embeddings_file, mmap_mode='r')
+                if os.path.exists(embeddings_file) else None
+            )
+        else:
+            self._load_pickled_documents(os.path.join(load_path, "documents.pkl"))
+
+        # Stores saved before the switch to inner product hold raw L2 vectors
+        if self.index.metric_type != faiss.METRIC_INNER_PRODUCT:
+            if self.document_embeddings is not None:
+                self.document_embeddings = self._unit_vectors(self.document_embeddings).astype(np.float16)
+            self._rebuild_index()
+            print("✓ Migrated L2 index to inner product over normalized vectors")
+        elif not isinstance(self.index, faiss.IndexIDMap2):
+            # Older stores used positional ids without an id map
+            self._rebuild_index()
 
         print(f"✓ Loaded vector store from {load_path}")
-        print(f"  Total documents: {len(self.documents)}")
+        print(f"  Total documents: {self._live_count()}")
+
+    def _load_pickled_documents(self, docs_file: str):
+        """Load documents and embeddings from the pickle written by older versions."""
+        with open(docs_file, 'rb') as f:
+            data = pickle.load(f)
+        self.document_embeddings = data['embeddings']
+        self.embedding_dimension = data['dimension']
+        if 'contents' in data:
+            self._set_documents(data['contents'], data['metadatas'])
+        else:
+            # Older still: the Document objects themselves
+            self._set_documents(
+                [None if doc is None else doc.page_content for doc in data['documents']],
+                [None if doc is None else doc.metadata for doc in data['documents']]
+            )
+
+    def _set_documents(
+        self,
+        contents: List[Optional[str]],
+        metadatas: Optional[List[Optional[Dict[str, Any]]]]
+    ):
+        """Replace the stored documents (metadata defaults to empty dicts)."""
+        if metadatas is None:
+            metadatas = [None if content is None else {} for content in contents]
+        self._contents = list(contents)
+        self._metadatas = list(metadatas)
+        self._doc_views = {}
+        self._meta_index = None
+        self._deleted = {i for i, content in enumerate(self._contents) if content is None}
 
     def get_stats(self) -> Dict[str, Any]:
         """Get statistics about the vector store."""
         return {
-            "total_documents": len(self.documents),
+            "total_documents": self._live_count(),
             "total_vectors": self.index.ntotal,
             "embedding_dimension": self.embedding_dimension,
-            "index_type": type(self.index).__name__
+            "index_type": type(self._base_index()).__name__
         }
 
+    def _live_count(self) -> int:
+        """Number of documents that have not been deleted."""
+        return len(self._contents) - len(self._deleted)
+
     def get_all_documents(self) -> List[Dict[str, Any]]:
         """
         Get all documents from the vector store for BM25 indexing.
@@ -165,48 +746,50 @@ class FAISSVectorStore:
         Returns:
             List of dictionaries with document content and metadata
         """
-        result = []
-        for idx, doc in enumerate(self.documents):
-            result.append({
-                'id': idx,
-                'content': doc.page_content,
-                'metadata': doc.metadata
-            })
-        return result
+        return [
+            {'id': idx, 'content': content, 'metadata': metadata}
+            for idx, (content, metadata) in enumerate(zip(self._contents, self._metadatas))
+            if content is not None
+        ]
 
     def delete_document(self, doc_id: int) -> bool:
         """
-        Delete a document by its ID (index).
+        Delete a document by its ID.
+
+        IDs of the remaining documents do not change.
 
         Args:
-            doc_id: Index of the document to delete
+            doc_id: ID of the document to delete
 
         Returns:
             True if deleted successfully, False otherwise
         """
-        if doc_id < 0 or doc_id >= len(self.documents):
+        if doc_id < 0 or doc_id >= len(self._contents) or self._contents[doc_id] is None:
             return False
 
-        # Remove document
-        del self.documents[doc_id]
-
-        # Remove embedding
-        if self.document_embeddings is not None:
-            self.document_embeddings = np.delete(self.document_embeddings, doc_id, axis=0)
+        # Tombstone the document so later ids keep pointing at the same documents
+        self._contents[doc_id] = None
+        self._metadatas[doc_id] = None
+        self._doc_views.pop(doc_id, None)
+        self._deleted.add(doc_id)
+        self._meta_index = None
 
-        # Rebuild FAISS index with remaining embeddings
-        self.index = faiss.IndexFlatL2(self.embedding_dimension)
-        if len(self.document_embeddings) > 0:
-            self.index.add(self.document_embeddings.astype('float32'))
+        # Flat indexes drop the vector; HNSW keeps it and search skips deleted ids
+        if not self._is_hnsw():
+            self._own_index()
+            self.index.remove_ids(np.array([doc_id], dtype=np.int64))
+            self._gpu_index = None
 
         print(f"✓ Deleted document {doc_id}")
-        print(f"  Remaining documents: {len(self.documents)}")
+        print(f"  Remaining documents: {self._live_count()}")
 
         return True
 
     def clear_all(self):
         """Clear all documents from the vector store."""
-        self.index = faiss.IndexFlatL2(self.embedding_dimension)
-        self.documents = []
+        self.index = self._create_index()
+        self._index_mapped = False
+        self._gpu_index = None
+        self._set_documents([], [])
         self.document_embeddings = None
         print("✓ Cleared all documents from vector store")
@@ -0,0 +1,298 @@
+"""Brute-force NumPy vector store for small corpora."""
+
+import os
+import json
+from typing import List, Tuple, Dict, Any, Optional
+import numpy as np
+from langchain.docstore.document import Document
+
+
+class NumpyVectorStore:
+    """
+    Exact vector search with one BLAS matrix product per query batch.
+
+    Meant for small deployments where installing FAISS is unwanted: up to
+    a few tens of thousands of documents, a single matrix-vector product
+    over the normalized corpus is as fast as a flat FAISS scan. Stores are
+    saved as ``embeddings.npy`` + ``documents.json``, so directories saved
+    by FAISSVectorStore open here too.
+    """
+
+    def __init__(self, embedding_dimension: int, index_path: str = None):
+        """
+        Initialize NumPy vector store.
+
+        Args:
+            embedding_dimension: Dimension of embeddings
+            index_path: Path to save/load the store
+        """
+        self.embedding_dimension = embedding_dimension
+        self.index_path = index_path
+        # Document ids are positions in these lists; deleted slots hold None
+        self._contents: List[Optional[str]] = []
+        self._metadatas: List[Optional[Dict[str, Any]]] = []
+        self._doc_views: Dict[int, Document] = {}
+        self._deleted: set = set()
+        # Unit-length float32 rows in a geometrically grown buffer
+        self._emb_buf = np.empty((0, embedding_dimension), dtype=np.float32)
+        self._emb_len = 0
+
+        docs_file = os.path.join(index_path, "documents.json") if index_path else None
+        if docs_file and os.path.exists(docs_file):
+            self.load()
+        else:
+            print(f"✓ Created new NumPy vector store with dimension {embedding_dimension}")
+
+    @property
+    def document_embeddings(self) -> np.ndarray:
+        """Stored unit embeddings, one row per document id (a view of the buffer)."""
+        return self._emb_buf[:self._emb_len]
+
+    def _document(self, idx: int) -> Document:
+        """Document view of a stored id, built once and reused."""
+        doc = self._doc_views.get(idx)
+        if doc is None:
+            doc = Document(page_content=self._contents[idx], metadata=self._metadatas[idx])
+            self._doc_views[idx] = doc
+        return doc
+
+    @staticmethod
+    def _unit_vectors(embeddings: np.ndarray) -> np.ndarray:
+        """Float32 copy of the embeddings scaled to unit length, as a 2D array."""
+        vectors = np.array(embeddings, dtype=np.float32, ndmin=2)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
+
+    def add_documents(self, documents: List[Document], embeddings: np.ndarray):
+        """
+        Add documents and their embeddings to the vector store.
+
+        Args:
+            documents: List of Document objects
+            embeddings: Numpy array of embeddings
+        """
+        if len(documents) != len(embeddings):
+            raise ValueError("Number of documents must match number of embeddings")
+
+        vectors = self._unit_vectors(embeddings)
+        self._contents.extend(doc.page_content for doc in documents)
+        self._metadatas.extend(doc.metadata for doc in documents)
+
+        needed = self._emb_len + len(vectors)
+        if needed > len(self._emb_buf):
+            buffer = np.empty((max(needed, 2 * len(self._emb_buf)), self.embedding_dimension), dtype=np.float32)
+            buffer[:self._emb_len] = self.document_embeddings
+            self._emb_buf = buffer
+        self._emb_buf[self._emb_len:needed] = vectors
+        self._emb_len = needed
+
+        print(f"✓ Added {len(documents)} documents to vector store")
+        print(f"  Total documents: {self._live_count()}")
+
+    def search(
+        self,
+        query_embedding: np.ndarray,
+        k: int = 5,
+        filter_metadata: Dict[str, Any] = None
+    ) -> List[Tuple[Document, float]]:
+        """
+        Search for similar documents.
+
+        Args:
+            query_embedding: Query embedding vector
+            k: Number of results to return
+            filter_metadata: Optional metadata key-value pairs results must match
+
+        Returns:
+            List of (Document, distance) tuples; distances are squared L2
+            between unit vectors (0 = identical, 4 = opposite)
+        """
+        return self.search_batch(query_embedding, k, filter_metadata)[0]
+
+    def search_batch(
+        self,
+        query_embeddings: np.ndarray,
+        k: int = 5,
+        filter_metadata: Dict[str, Any] = None
+    ) -> List[List[Tuple[Document, float]]]:
+        """
+        Search for several queries with one matrix product.
+
+        Args:
+            query_embeddings: Query embedding vectors, one per row
+            k: Number of results to return per query
+            filter_metadata: Optional metadata key-value pairs results must match
+
+        Returns:
+            One list of (Document, distance) tuples per query
+        """
+        queries = self._unit_vectors(query_embeddings)
+        scores = queries @ self.document_embeddings.T
+
+        candidates = self._candidate_mask(filter_metadata)
+        available = self._emb_len
+        if candidates is not None:
+            scores[:, ~candidates] = -np.inf
+            available = int(candidates.sum())
+
+        k = min(k, available)
+        if k <= 0:
+            return [[] for _ in range(len(queries))]
+
+        # Top k per row without sorting the whole corpus, then order those k
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind='stable')
+        top = np.take_along_axis(top, order, axis=1)
+
+        # For unit vectors, squared L2 distance = 2 - 2 * inner product
+        distances = (2.0 - 2.0 * np.take_along_axis(top_scores, order, axis=1).astype(np.float64)).tolist()
+
+        return [
+            [(self._document(idx), distance) for idx, distance in zip(row_ids, row_distances)]
+            for row_ids, row_distances in zip(top.tolist(), distances)
+        ]
+
+    def _candidate_mask(self, filters: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        """Boolean mask of live documents matching the filters (None if all match)."""
+        if not filters and not self._deleted:
+            return None
+
+        if filters:
+            items = tuple(filters.items())
+            matches = (
+                metadata is not None and all(metadata.get(key) == value for key, value in items)
+                for metadata in self._metadatas
+            )
+        else:
+            matches = (content is not None for content in self._contents)
+        return np.fromiter(matches, dtype=bool, count=len(self._contents))
+
+    def save(self, path: str = None, include_metadata: bool = True):
+        """
+        Save the vector store to disk.
+
+        Args:
+            path: Directory path to save the store
+            include_metadata: Whether to save document metadata (documents
+                load with empty metadata otherwise)
+        """
+        save_path = path or self.index_path
+
+        if not save_path:
+            raise ValueError("No save path specified")
+
+        os.makedirs(save_path, exist_ok=True)
+
+        # Half precision on disk, like FAISSVectorStore
+        embeddings_file = os.path.join(save_path, "embeddings.npy")
+        with open(f"{embeddings_file}.tmp", 'wb') as f:
+            np.save(f, self.document_embeddings.astype(np.float16))
+        os.replace(f"{embeddings_file}.tmp", embeddings_file)
+
+        docs_file = os.path.join(save_path, "documents.json")
+        with open(f"{docs_file}.tmp", 'w', encoding='utf-8') as f:
+            json.dump({
+                'dimension': self.embedding_dimension,
+                'contents': self._contents,
+                'metadatas': self._metadatas if include_metadata else None
+            }, f, ensure_ascii=False, default=str)
+        os.replace(f"{docs_file}.tmp", docs_file)
+
+        print(f"✓ Saved vector store to {save_path}")
+
+    def load(self, path: str = None, mmap: bool = True):
+        """
+        Load the vector store from disk.
+
+        Args:
+            path: Directory path to load the store from
+            mmap: Accepted for interface compatibility and ignored: stored
+                vectors are renormalized into memory for searching
+        """
+        load_path = path or self.index_path
+
+        if not load_path or not os.path.exists(load_path):
+            raise ValueError(f"Invalid load path: {load_path}")
+
+        with open(os.path.join(load_path, "documents.json"), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self.embedding_dimension = data['dimension']
+        self._contents = data['contents']
+        self._metadatas = data['metadatas'] or [
+            None if content is None else {} for content in self._contents
+        ]
+        self._doc_views = {}
+        self._deleted = {i for i, content in enumerate(self._contents) if content is None}
+
+        embeddings_file = os.path.join(load_path, "embeddings.npy")
+        if os.path.exists(embeddings_file):
+            self._emb_buf = self._unit_vectors(np.load(embeddings_file))
+        else:
+            self._emb_buf = np.empty((0, self.embedding_dimension), dtype=np.float32)
+        self._emb_len = len(self._emb_buf)
+
+        print(f"✓ Loaded vector store from {load_path}")
+        print(f"  Total documents: {self._live_count()}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get statistics about the vector store."""
+        return {
+            "total_documents": self._live_count(),
+            "total_vectors": self._emb_len,
+            "embedding_dimension": self.embedding_dimension,
+            "index_type": "NumpyFlatIP"
+        }
+
+    def _live_count(self) -> int:
+        """Number of documents that have not been deleted."""
+        return len(self._contents) - len(self._deleted)
+
+    def get_all_documents(self) -> List[Dict[str, Any]]:
+        """
+        Get all documents from the vector store for BM25 indexing.
+
+        Returns:
+            List of dictionaries with document content and metadata
+        """
+        return [
+            {'id': idx, 'content': content, 'metadata': metadata}
+            for idx, (content, metadata) in enumerate(zip(self._contents, self._metadatas))
+            if content is not None
+        ]
+
+    def delete_document(self, doc_id: int) -> bool:
+        """
+        Delete a document by its ID.
+
+        IDs of the remaining documents do not change.
+
+        Args:
+            doc_id: ID of the document to delete
+
+        Returns:
+            True if deleted successfully, False otherwise
+        """
+        if doc_id < 0 or doc_id >= len(self._contents) or self._contents[doc_id] is None:
+            return False
+
+        self._contents[doc_id] = None
+        self._metadatas[doc_id] = None
+        self._doc_views.pop(doc_id, None)
+        self._deleted.add(doc_id)
+
+        print(f"✓ Deleted document {doc_id}")
+        print(f"  Remaining documents: {self._live_count()}")
+
+        return True
+
+    def clear_all(self):
+        """Clear all documents from the vector store."""
+        self._contents = []
+        self._metadatas = []
+        self._doc_views = {}
+        self._deleted = set()
+        self._emb_buf = np.empty((0, self.embedding_dimension), dtype=np.float32)
+        self._emb_len = 0
+        print("✓ Cleared all documents from vector store")
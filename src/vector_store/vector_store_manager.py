@@ -1,35 +1,145 @@
 """Vector store manager for handling different vector database types."""
 
-from typing import List, Tuple
+from typing import Any, Dict, List, Optional, Protocol, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import sqlite3
+import numpy as np
 from langchain.docstore.document import Document
 from .embeddings import EmbeddingGenerator
-from .faiss_store import FAISSVectorStore
+from .numpy_store import NumpyVectorStore
+from ..cache.embedding_cache import EmbeddingCache, DEFAULT_CACHE_DIR
+from ..cache.document_embedding_cache import SQLiteEmbeddingCache, DEFAULT_DOCUMENT_CACHE_PATH
+
+try:
+    from .faiss_store import FAISSVectorStore
+except ImportError:  # faiss is optional; small stores can use NumPy search
+    FAISSVectorStore = None
+
+
+class VectorStore(Protocol):
+    """Interface shared by the vector store backends (FAISS and NumPy)."""
+
+    def add_documents(self, documents: List[Document], embeddings: np.ndarray) -> None: ...
+
+    def search(
+        self, query_embedding: np.ndarray, k: int = 5, filter_metadata: Dict[str, Any] = None
+    ) -> List[Tuple[Document, float]]: ...
+
+    def search_batch(
+        self, query_embeddings: np.ndarray, k: int = 5, filter_metadata: Dict[str, Any] = None
+    ) -> List[List[Tuple[Document, float]]]: ...
+
+    def save(self, path: str = None, include_metadata: bool = True) -> None: ...
+
+    def load(self, path: str = None, mmap: bool = True) -> None: ...
+
+    def get_stats(self) -> Dict[str, Any]: ...
+
+    def get_all_documents(self) -> List[Dict[str, Any]]: ...
+
+    def delete_document(self, doc_id: int) -> bool: ...
+
+    def clear_all(self) -> None: ...
 
 
 class VectorStoreManager:
     """Manage vector store operations with embedding generation."""
 
+    # Documents embedded per ingest step; the store adds one step while the next is encoded
+    INGEST_CHUNK_SIZE = 4096
+
     def __init__(
         self,
         embedding_model: str,
         vector_db_type: str = "faiss",
-        vector_db_path: str = "./data/vector_store"
+        vector_db_path: str = "./data/vector_store",
+        use_embedding_cache: bool = True,
+        embedding_cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+        embedding_batch_window_ms: float = 0,
+        embedding_precision: str = "auto",
+        embedding_backend: str = "torch",
+        use_gpu: bool = False,
+        hnsw_ef_search: Optional[int] = None,
+        compression: str = "none",
+        document_cache_path: Optional[str] = DEFAULT_DOCUMENT_CACHE_PATH
     ):
         """
         Initialize vector store manager.
 
         Args:
             embedding_model: Name of the embedding model
-            vector_db_type: Type of vector database ("faiss" or "pinecone")
+            vector_db_type: Type of vector database ("faiss", "faiss-hnsw",
+                "numpy" or "pinecone"); "faiss-hnsw" always uses an HNSW graph
             vector_db_path: Path to store vector database
+            use_embedding_cache: Whether to cache query embeddings
+            embedding_cache_dir: Directory for on-disk query embeddings (None for memory only)
+            embedding_batch_window_ms: If positive, batch concurrent query embeddings
+                arriving within this window (for multi-threaded servers)
+            embedding_precision: Embedding inference precision ("auto", "fp32",
+                "fp16" or "int8"; see EmbeddingGenerator)
+            embedding_backend: Embedding runtime ("torch", "onnx" or "openvino")
+            use_gpu: Whether FAISS serves searches from a GPU copy of the index
+            hnsw_ef_search: HNSW candidate list length per search (None for
+                the FAISSVectorStore default)
+            compression: FAISS vector compression ("none" or "sq8" for 8-bit
+                scalar quantization; the largest corpora always use IVF-PQ)
+            document_cache_path: SQLite file caching document embeddings across
+                re-indexing runs (None disables it)
         """
-        self.embedding_generator = EmbeddingGenerator(embedding_model)
+        self.embedding_generator = EmbeddingGenerator(
+            embedding_model,
+            precision=embedding_precision,
+            batch_window_ms=embedding_batch_window_ms,
+            backend=embedding_backend
+        )
         self.vector_db_type = vector_db_type
         self.vector_db_path = vector_db_path
 
+        # Cache keys are lowercased only when the model ignores case anyway
+        tokenizer = getattr(self.embedding_generator.model, 'tokenizer', None)
+        uncased = bool(getattr(tokenizer, 'do_lower_case', False))
+        # Quantized vectors differ measurably, so they get their own cache entries
+        cache_model = embedding_model
+        if self.embedding_generator.precision == "int8":
+            cache_model = f"{embedding_model}#int8"
+
+        # Query embedding cache
+        self.embedding_cache = None
+        if use_embedding_cache:
+            self.embedding_cache = EmbeddingCache(
+                model_name=cache_model,
+                cache_dir=embedding_cache_dir,
+                lowercase=uncased
+            )
+            self.embedding_generator.cache = self.embedding_cache
+
+        # Document embedding cache; indexing still works without it
+        self.document_cache = None
+        if document_cache_path:
+            try:
+                self.document_cache = SQLiteEmbeddingCache(
+                    cache_model, document_cache_path, lowercase=uncased
+                )
+            except (OSError, sqlite3.Error) as e:
+                print(f"⚠ Document embedding cache disabled: {e}")
+
         # Initialize vector store
-        if vector_db_type == "faiss":
+        self.vector_store: VectorStore
+        if vector_db_type in ("faiss", "faiss-hnsw") and FAISSVectorStore is None:
+            print("⚠ faiss is not installed; falling back to NumPy brute-force search")
+            vector_db_type = self.vector_db_type = "numpy"
+
+        if vector_db_type in ("faiss", "faiss-hnsw"):
             self.vector_store = FAISSVectorStore(
+                embedding_dimension=self.embedding_generator.get_dimension(),
+                index_path=vector_db_path,
+                use_gpu=use_gpu,
+                index_type="hnsw" if vector_db_type == "faiss-hnsw" else "auto",
+                ef_search=hnsw_ef_search,
+                compression=compression
+            )
+        elif vector_db_type == "numpy":
+            self.vector_store = NumpyVectorStore(
                 embedding_dimension=self.embedding_generator.get_dimension(),
                 index_path=vector_db_path
             )
@@ -39,6 +149,10 @@ class VectorStoreManager:
         else:
             raise ValueError(f"Unsupported vector database type: {vector_db_type}")
 
+        # Bound once for the per-query path; both objects live as long as the manager
+        self._embed_text = self.embedding_generator.embed_text
+        self._store_search = self.vector_store.search
+
     def index_documents(self, documents: List[Document]):
         """
         Index documents into the vector store.
@@ -48,19 +162,87 @@ class VectorStoreManager:
         """
         print(f"Generating embeddings for {len(documents)} documents...")
 
-        # Extract text content
-        texts = [doc.page_content for doc in documents]
+        # Encoding and index insertion both release the GIL, so the store
+        # inserts chunk i on a worker while chunk i + 1 is embedded here. A
+        # single worker keeps insertions (and so document ids) in order, and
+        # waiting on it before submitting bounds memory to two chunks.
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="ingest") as executor:
+            pending = None
+            for start in range(0, len(documents), self.INGEST_CHUNK_SIZE):
+                chunk = documents[start:start + self.INGEST_CHUNK_SIZE]
+                embeddings = self._embed_documents([doc.page_content for doc in chunk])
+                if pending is not None:
+                    pending.result()
+                pending = executor.submit(self.vector_store.add_documents, chunk, embeddings)
+            if pending is not None:
+                pending.result()
+
+    def _embed_documents(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed document texts, reusing cached embeddings for unchanged texts.
+
+        Args:
+            texts: Document texts
+
+        Returns:
+            Float32 array with one embedding row per text
+        """
+        if self.document_cache is not None:
+            return self._embed_with_cache(texts)
+        embeddings = np.empty((len(texts), self.embedding_generator.get_dimension()), dtype=np.float32)
+        self.embedding_generator.embed_batch_into(texts, embeddings)
+        return embeddings
+
+    def _embed_with_cache(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts, encoding only those missing from the document cache.
+
+        Args:
+            texts: Document texts
+
+        Returns:
+            Float32 array with one embedding row per text
+        """
+        keys = [self.document_cache.key(text) for text in texts]
+        cached = self.document_cache.get_many(keys)
+
+        # Encode each missing text once, even if it repeats in the batch
+        missing: Dict[bytes, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+        if missing:
+            fresh = np.empty((len(missing), self.embedding_generator.get_dimension()), dtype=np.float32)
+            self.embedding_generator.embed_batch_into(list(missing.values()), fresh)
+            new_entries = dict(zip(missing, fresh))
+            self.document_cache.put_many(new_entries.items())
+            cached.update(new_entries)
+
+        embeddings = np.empty((len(texts), self.embedding_generator.get_dimension()), dtype=np.float32)
+        for row, key in enumerate(keys):
+            embeddings[row] = cached[key]
+
+        print(f"  Embedding cache: {len(texts) - len(missing)} reused, {len(missing)} encoded")
+        return embeddings
 
-        # Generate embeddings
-        embeddings = self.embedding_generator.embed_batch(texts)
+    def embed_query(self, query: str) -> np.ndarray:
+        """
+        Generate the embedding for a search query.
 
-        # Add to vector store
-        self.vector_store.add_documents(documents, embeddings)
+        Args:
+            query: Search query text
+
+        Returns:
+            Query embedding vector
+        """
+        # Served from the embedding cache when enabled
+        return self._embed_text(query)
 
     def search(
         self,
         query: str,
-        k: int = 5
+        k: int = 5,
+        filter_metadata: Dict[str, Any] = None
     ) -> List[Tuple[Document, float]]:
         """
         Search for similar documents.
@@ -68,33 +250,97 @@ class VectorStoreManager:
         Args:
             query: Search query text
             k: Number of results to return
+            filter_metadata: Optional metadata key-value pairs results must match
 
         Returns:
             List of (Document, similarity_score) tuples
         """
-        # Generate query embedding
-        query_embedding = self.embedding_generator.embed_text(query)
+        # Embed and search through the bound methods, skipping two wrapper calls
+        return self._store_search(self._embed_text(query), k, filter_metadata)
+
+    def embed_queries(self, queries: List[str]) -> np.ndarray:
+        """
+        Generate embeddings for several queries with one batched encode.
+
+        Args:
+            queries: Search query texts
+
+        Returns:
+            Float32 array with one embedding row per query
+        """
+        cache = self.embedding_cache
+        embeddings = [None if cache is None else cache.get(query) for query in queries]
+
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            fresh = self.embedding_generator.embed_batch([queries[i] for i in missing])
+            for i, embedding in zip(missing, fresh):
+                embeddings[i] = embedding
+                if cache is not None:
+                    cache.put(queries[i], embedding)
+
+        return np.asarray(embeddings, dtype=np.float32).reshape(len(queries), -1)
+
+    def search_batch(
+        self,
+        queries: List[str],
+        k: int = 5,
+        filter_metadata: Dict[str, Any] = None
+    ) -> List[List[Tuple[Document, float]]]:
+        """
+        Search for several queries at once.
 
-        # Search vector store
-        results = self.vector_store.search(query_embedding, k)
+        Queries are embedded in one model call and searched in one vector
+        store call, amortizing per-call overhead across the batch.
 
-        return results
+        Args:
+            queries: Search query texts
+            k: Number of results to return per query
+            filter_metadata: Optional metadata key-value pairs results must match
+
+        Returns:
+            One list of (Document, similarity_score) tuples per query
+        """
+        if not queries:
+            return []
+        return self.vector_store.search_batch(self.embed_queries(queries), k, filter_metadata)
+
+    def search_by_embedding(
+        self,
+        query_embedding: np.ndarray,
+        k: int = 5,
+        filter_metadata: Dict[str, Any] = None
+    ) -> List[Tuple[Document, float]]:
+        """
+        Search for similar documents with a precomputed query embedding.
+
+        Args:
+            query_embedding: Query embedding vector
+            k: Number of results to return
+            filter_metadata: Optional metadata key-value pairs results must match
+
+        Returns:
+            List of (Document, similarity_score) tuples
+        """
+        return self._store_search(query_embedding, k, filter_metadata)
 
     def save(self):
         """Save the vector store to disk."""
-        if hasattr(self.vector_store, 'save'):
-            self.vector_store.save()
+        self.vector_store.save()
 
-    def load(self):
-        """Load the vector store from disk."""
-        if hasattr(self.vector_store, 'load'):
-            self.vector_store.load()
+    def load(self, mmap: bool = True):
+        """
+        Load the vector store from disk.
+
+        Args:
+            mmap: Whether to memory-map the index file instead of reading it
+                (stores without a mappable index ignore it)
+        """
+        self.vector_store.load(mmap=mmap)
 
     def get_stats(self):
         """Get vector store statistics."""
-        if hasattr(self.vector_store, 'get_stats'):
-            return self.vector_store.get_stats()
-        return {}
+        return self.vector_store.get_stats()
 
     def get_all_documents(self):
         """
@@ -103,9 +349,7 @@ class VectorStoreManager:
         Returns:
             List of all documents with their metadata
         """
-        if hasattr(self.vector_store, 'get_all_documents'):
-            return self.vector_store.get_all_documents()
-        return []
+        return self.vector_store.get_all_documents()
 
     def delete_document(self, doc_id: int) -> bool:
         """
@@ -117,15 +361,12 @@ class VectorStoreManager:
         Returns:
             True if deleted successfully
         """
-        if hasattr(self.vector_store, 'delete_document'):
-            success = self.vector_store.delete_document(doc_id)
-            if success:
-                self.save()
-            return success
-        return False
+        success = self.vector_store.delete_document(doc_id)
+        if success:
+            self.save()
+        return success
 
     def clear_all_documents(self):
         """Clear all documents from the vector store."""
-        if hasattr(self.vector_store, 'clear_all'):
-            self.vector_store.clear_all()
-            self.save()
+        self.vector_store.clear_all()
+        self.save()
@@ -0,0 +1,64 @@
+"""Tests for session expiry bookkeeping."""
+
+import unittest
+from unittest import mock
+
+from src.session import session_manager
+from src.session.session_manager import SessionManager
+
+
+class FakeClock:
+    """Stand-in for time.monotonic() that only moves when told to."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class SessionExpiryTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch.object(session_manager.time, "monotonic", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.manager = SessionManager(max_history=5, session_timeout=1)
+
+    def test_heap_tracks_live_sessions_not_messages(self):
+        ids = [self.manager.create_session() for _ in range(20)]
+        for turn in range(50):
+            self.clock.now += 10
+            for sid in ids:
+                self.manager.add_message(sid, "user", f"question {turn}")
+                self.manager.add_message(sid, "assistant", f"answer {turn}")
+
+        self.assertEqual(self.manager.get_session_count(), 20)
+        self.assertLessEqual(len(self.manager._expiry_heap), 20)
+
+    def test_deleted_sessions_do_not_accumulate(self):
+        for _ in range(1000):
+            self.manager.delete_session(self.manager.create_session())
+        keep = self.manager.create_session()
+
+        self.assertEqual(self.manager.get_session_count(), 1)
+        self.assertLessEqual(len(self.manager._expiry_heap), 2 * 1 + 16)
+        self.assertIsNotNone(self.manager.get_session(keep))
+
+    def test_idle_sessions_expire_and_active_ones_survive(self):
+        idle = self.manager.create_session()
+        active = self.manager.create_session()
+        for _ in range(3):
+            self.clock.now += 40
+            self.manager.add_message(active, "user", "still here")
+
+        self.clock.now += 1
+        self.manager.create_session()
+
+        self.assertNotIn(idle, self.manager.sessions)
+        self.assertIn(active, self.manager.sessions)
+        self.assertEqual(len(self.manager._expiry_heap), self.manager.get_session_count())
+
+
+if __name__ == "__main__":
+    unittest.main()